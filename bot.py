@@ -1,40 +1,73 @@
 import asyncio
+import atexit
+import hashlib
 import json
 import logging
+import logging.handlers
 import os
+import queue
 from pathlib import Path
 
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
-from cogs.admin import Admin
-from cogs.music import Music
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from utils.queue_manager import QueueManager
 from utils.playlist_store import PlaylistStore
 
 
 CONFIG_PATH = Path("config.json")
 LOG_PATH = Path("logs/bot.log")
+COMMAND_HASH_PATH = Path("logs/.command_hash")
+ADMIN_PERMISSIONS = discord.Permissions(permissions=8)
 
 
 def load_config() -> dict:
     if not CONFIG_PATH.exists():
         raise FileNotFoundError("config.json not found. Please create it before running the bot.")
-    with CONFIG_PATH.open("r", encoding="utf-8") as fp:
-        return json.load(fp)
-
-
-def setup_logging():
+    data = CONFIG_PATH.read_bytes()
+    config = orjson.loads(data) if orjson is not None else json.loads(data)
+    config["allowed_roles"] = normalize_roles(config.get("allowed_roles") or [])
+    return config
+
+
+def normalize_roles(roles: list) -> list:
+    # Role IDs become ints once at load time; anything non-numeric is kept as a role name.
+    normalized = []
+    for role in roles:
+        if isinstance(role, int):
+            normalized.append(role)
+            continue
+        try:
+            normalized.append(int(role))
+        except (TypeError, ValueError):
+            normalized.append(str(role))
+    return normalized
+
+
+def setup_logging() -> logging.handlers.QueueListener:
     LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        handlers=[
-            logging.FileHandler(LOG_PATH, encoding="utf-8"),
-            logging.StreamHandler(),
-        ],
-    )
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    file_handler = logging.FileHandler(LOG_PATH, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+    # Handlers do their I/O on the listener thread; log calls on the event loop only enqueue.
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    # Added directly rather than via basicConfig, which would give the QueueHandler a default formatter
+    # that prepare() bakes into the record before the listener formats it again.
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
 
 
 def resolve_token(config: dict) -> str:
@@ -48,21 +81,61 @@ class MusicBot(commands.Bot):
         self.queue_manager = QueueManager(max_length=config.get("max_queue_length", 50))
         self.playlist_store = PlaylistStore()
         self.logger = logging.getLogger("MusicBot")
+        self._invite_url: str | None = None
 
     async def setup_hook(self):
-        await self.add_cog(Music(self, self.config, self.queue_manager, self.playlist_store))
-        await self.add_cog(Admin(self, self.config, self.queue_manager, self.playlist_store))
-        await self.tree.sync()
+        from cogs.admin import Admin
+        from cogs.music import Music
+
+        await asyncio.gather(
+            self.add_cog(Music(self, self.config, self.queue_manager, self.playlist_store)),
+            self.add_cog(Admin(self, self.config, self.queue_manager, self.playlist_store)),
+        )
+        await self._sync_commands_if_changed()
+        self.logger.info("Bot is ready.")
+        if self._invite_url is None:
+            self._invite_url = discord.utils.oauth_url(self.user.id, permissions=ADMIN_PERMISSIONS)
+        self.logger.info("Invite URL: %s", self._invite_url)
+
+    async def close(self):
+        await self.playlist_store.flush()
+        await super().close()
+        self.playlist_store.close()
+
+    def _command_payload(self) -> list[dict]:
+        return [cmd.to_dict(self.tree) for cmd in self.tree.get_commands()]
+
+    @staticmethod
+    def _payload_hash(application_id: int, payload: list[dict]) -> str:
+        if orjson is not None:
+            blob = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        else:
+            blob = json.dumps(payload, sort_keys=True).encode("utf-8")
+        # Scope the digest to the application so another bot sharing logs/ still gets its own sync.
+        digest = hashlib.blake2b(blob, digest_size=16)
+        digest.update(str(application_id).encode("ascii"))
+        return digest.hexdigest()
+
+    async def _sync_commands_if_changed(self):
+        # Build the command payload once and use it for both the hash and the upsert body.
+        payload = self._command_payload()
+        digest = self._payload_hash(self.application_id, payload)
+        try:
+            if COMMAND_HASH_PATH.read_text(encoding="utf-8").strip() == digest:
+                self.logger.info("Slash commands unchanged; skipping sync.")
+                return
+        except OSError:
+            pass
+        await self.http.bulk_upsert_global_commands(self.application_id, payload=payload)
         self.logger.info("Slash commands synced.")
-        print("Bot is ready.")
-        print("Invite URL:", discord.utils.oauth_url(self.user.id, permissions=discord.Permissions(permissions=8)))
-
+        try:
+            COMMAND_HASH_PATH.parent.mkdir(parents=True, exist_ok=True)
+            COMMAND_HASH_PATH.write_text(digest, encoding="utf-8")
+        except OSError as exc:
+            self.logger.warning("Failed to store command hash: %s", exc)
 
-def main():
-    load_dotenv()
-    setup_logging()
-    config = load_config()
 
+async def run_bot(config: dict, token: str):
     intents = discord.Intents.default()
     intents.message_content = True
     intents.voice_states = True
@@ -74,12 +147,30 @@ def main():
         allowed_mentions=discord.AllowedMentions.none(),
     )
 
+    bot.logger.info("Starting bot...")
+    async with bot:
+        await bot.start(token)
+
+
+def main():
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    load_dotenv()
+    setup_logging()
+    config = load_config()
+
     token = resolve_token(config)
     if not token:
         raise RuntimeError("Discord token missing. Set DISCORD_TOKEN env var or fill config.json.")
 
-    bot.logger.info("Starting bot...")
-    bot.run(token)
+    try:
+        asyncio.run(run_bot(config, token))
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
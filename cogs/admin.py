@@ -1,3 +1,7 @@
+import asyncio
+import os
+import tempfile
+
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -6,6 +10,22 @@ from utils.queue_manager import QueueManager
 from pathlib import Path
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _atomic_write(path: Path, payload: bytes):
+    # A unique temp file per write, so concurrent /setroles calls can't interleave or steal each other's file.
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False) as fp:
+        fp.write(payload)
+    try:
+        os.replace(fp.name, path)
+    except OSError:
+        os.unlink(fp.name)
+        raise
+
 
 class Admin(commands.Cog):
     def __init__(self, bot: commands.Bot, config: dict, queue_manager: QueueManager, playlist_store=None):
@@ -14,26 +34,25 @@ class Admin(commands.Cog):
         self.queue_manager = queue_manager
         self.playlist_store = playlist_store
         self.config_path = Path("config.json")
+        self._allowed_ids: frozenset[int] = frozenset()
+        self._allowed_names: frozenset[str] = frozenset()
+        self._rebuild_role_cache(self.config.get("allowed_roles") or [])
+
+    def _rebuild_role_cache(self, allowed_roles: list):
+        # allowed_roles is normalized at config load: ints are role IDs, strings are role names.
+        self._allowed_ids = frozenset(r for r in allowed_roles if isinstance(r, int))
+        self._allowed_names = frozenset(r for r in allowed_roles if not isinstance(r, int))
 
     def _has_permission(self, member: discord.Member) -> bool:
+        if not self._allowed_ids and not self._allowed_names:
+            return True
         if member.guild_permissions.administrator:
             return True
-        allowed_roles = self.config.get("allowed_roles") or []
-        if not allowed_roles:
+        member_role_ids = {r.id for r in member.roles}
+        if not self._allowed_ids.isdisjoint(member_role_ids):
             return True
-        allowed_ids = set()
-        allowed_names = set()
-        for role in allowed_roles:
-            if isinstance(role, int):
-                allowed_ids.add(role)
-            else:
-                try:
-                    allowed_ids.add(int(role))
-                except (TypeError, ValueError):
-                    allowed_names.add(str(role))
-        for role in member.roles:
-            if role.id in allowed_ids or role.name in allowed_names:
-                return True
+        if self._allowed_names:
+            return any(r.name in self._allowed_names for r in member.roles)
         return False
 
     @app_commands.command(name="shutdown", description="Admin: shut down the bot.")
@@ -78,19 +97,17 @@ class Admin(commands.Cog):
             await interaction.response.send_message("Administrator permission required.", ephemeral=True)
             return
         role_objs = [r for r in (role1, role2, role3, role4, role5) if r is not None]
-        role_ids = [r.id for r in role_objs]
         # Deduplicate while preserving order
-        seen = set()
-        deduped = []
-        for rid in role_ids:
-            if rid not in seen:
-                deduped.append(rid)
-                seen.add(rid)
+        deduped = list(dict.fromkeys(r.id for r in role_objs))
         self.config["allowed_roles"] = deduped
+        self._rebuild_role_cache(deduped)
         # Persist to config.json if possible
         try:
-            with self.config_path.open("w", encoding="utf-8") as fp:
-                json.dump(self.config, fp, indent=2)
+            if orjson is not None:
+                payload = orjson.dumps(self.config, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(self.config, indent=2).encode("utf-8")
+            await asyncio.to_thread(_atomic_write, self.config_path, payload)
         except Exception as exc:
             await interaction.response.send_message(f"Updated in memory, but failed to write config: {exc}", ephemeral=True)
             return
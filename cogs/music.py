@@ -1,11 +1,16 @@
 import asyncio
+import dataclasses
+import functools
+import itertools
 import logging
-import math
+import re
 import time
-from typing import List, Optional, Tuple
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
 
+import aiohttp
 import discord
-import requests
 from discord import app_commands
 from discord.ext import commands
 import yt_dlp
@@ -13,10 +18,72 @@ import yt_dlp
 from utils.audio_source import AudioSource
 from utils.queue_manager import QueueManager, Track
 from utils.playlist_store import PlaylistStore
-
-
-BASE_FFMPEG_BEFORE = "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin"
-DEFAULT_FFMPEG_OPTIONS = {"options": "-vn"}
+from utils.ttl_cache import TTLCache
+
+
+BASE_FFMPEG_BEFORE = (
+    "-nostdin -nostats -loglevel error -probesize 32k -analyzeduration 0 -fflags nobuffer -flags low_delay "
+    "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5"
+)
+LIVE_FFMPEG_BEFORE = "-rw_timeout 5000000"
+PANEL_UPDATE_DELAY = 0.25
+CONTROL_PRIORITY = 0
+BACKGROUND_PRIORITY = 5
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+RELATED_TTL = 3600
+RELATED_EMPTY_TTL = 300
+AUTOPLAY_CANDIDATES = 3
+AUTOCOMPLETE_TTL = 300
+PLAYLIST_RESOLVE_CONCURRENCY = 8
+AUTOCOMPLETE_ETAG_TTL = 3600
+DEFAULT_FFMPEG_OPTIONS = {"options": "-vn -sn -dn -threads 1"}
+TIMESTAMP_RE = re.compile(r"\d+(?::\d+){1,2}")
+PROGRESS_SLOTS = 18
+PROGRESS_BARS = tuple(
+    "".join("🔘" if i == filled else "▬" for i in range(PROGRESS_SLOTS)) for filled in range(PROGRESS_SLOTS)
+)
+UNKNOWN_PROGRESS = ("🔘 " + "▬" * PROGRESS_SLOTS, "?:?? / ??:??")
+
+
+@dataclass(slots=True)
+class GuildPlayback:
+    current: Optional[Track] = None
+    start_time: Optional[float] = None
+    pause_offset: float = 0.0
+    pause_mark: Optional[float] = None
+    skip_after: bool = False
+    # Last known player state ("playing", "paused" or "idle"), kept in step with our own transitions.
+    status: str = "idle"
+    votes: set[int] = field(default_factory=set)
+
+    def reset(self):
+        # Clearing the track and its progress is one transition; never do one without the other.
+        self.current = None
+        self.start_time = None
+        self.pause_offset = 0.0
+        self.pause_mark = None
+        self.status = "idle"
+        self.votes = set()
+
+    def mark_paused(self, now: float):
+        self.pause_mark = now
+        self.status = "paused"
+
+    def mark_resumed(self, now: float):
+        if self.pause_mark:
+            self.pause_offset += now - self.pause_mark
+        self.pause_mark = None
+        self.status = "playing"
+
+
+@dataclass(slots=True)
+class GuildSettings:
+    # Per-guild preferences that outlive a voice session (GuildPlayback is dropped on disconnect).
+    last_channel: Optional[discord.TextChannel] = None
+    autoplay: bool = False
+    autoplay_playlist: Optional[str] = None
+    autoplay_playlist_pos: int = 0
+    temp_djs: set[int] = field(default_factory=set)
 
 
 class Music(commands.Cog):
@@ -27,24 +94,58 @@ class Music(commands.Cog):
         self.playlist_store = playlist_store
         self.audio_source = AudioSource(config)
         self.logger = logging.getLogger("MusicCog")
-        self.current: dict[int, Optional[Track]] = {}
+        self.playback: defaultdict[int, GuildPlayback] = defaultdict(GuildPlayback)
         self.default_volume = float(config.get("default_volume", 0.5))
         self.youtube_api_key = (
             config.get("youtube_api_key") or self.audio_source.youtube_api_key
         )
         self.idle_timeout = 120
-        self.start_times: dict[int, float] = {}
-        self.pause_offsets: dict[int, float] = {}
-        self.pause_marks: dict[int, float] = {}
-        self.panels: dict[int, list[discord.Message]] = {}
-        self.last_channel: dict[int, discord.TextChannel] = {}
-        self.skip_after: dict[int, bool] = {}
-        self.temp_djs: dict[int, set[int]] = {}
-        self.votes: dict[int, set[int]] = {}
-        self.history: dict[int, List[Track]] = {}
-        self.autoplay: dict[int, bool] = {}
-        self.autoplay_playlist: dict[int, Optional[str]] = {}
-        self.autoplay_playlist_pos: dict[int, int] = {}
+        self.panels: dict[int, dict[int, discord.Message]] = {}
+        self.settings: defaultdict[int, GuildSettings] = defaultdict(GuildSettings)
+        self.history: dict[int, Deque[Track]] = {}
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._ac_cache = TTLCache(maxsize=512, ttl=AUTOCOMPLETE_TTL)
+        # Outlives _ac_cache so expired entries can be revalidated with If-None-Match.
+        self._ac_etags = TTLCache(maxsize=512, ttl=AUTOCOMPLETE_ETAG_TTL)
+        self._related_cache = TTLCache(maxsize=512, ttl=RELATED_TTL)
+        self._embed_cache: dict[int, tuple[Track, str, str, discord.Embed]] = {}
+        # Shared by every idle panel. Its identity never changes, so _update_panels' identity skip is only
+        # sound because posting or deleting a panel drops the guild's snapshot.
+        self._idle_embed = discord.Embed(title="Nothing Playing", description="Queue is empty.", color=0x2b2d31)
+        self._idle_embed.set_footer(text="Use /play or /search to add a track.")
+        self._allowed_roles_src: Optional[list] = None
+        self._allowed_role_ids: frozenset[int] = frozenset()
+        self._allowed_role_names: frozenset[str] = frozenset()
+        self._role_cache_ready = False
+        self._refresh_role_cache()
+        self._idle_tasks: dict[int, asyncio.Task] = {}
+        self._control_view: Optional[ControlView] = None
+        self._panel_update_task: Optional[asyncio.Task] = None
+        self._panel_update_pending: set[int] = set()
+        self._panel_snapshots: dict[int, tuple[discord.Embed, ControlView]] = {}
+        self.voice_clients: dict[int, discord.VoiceClient] = {}
+        self._voice_locks: dict[int, asyncio.Lock] = {}
+        self._vote_thresholds: dict[int, int] = {}
+        # Next lazy track being materialized while the current one plays, keyed by guild.
+        self._prefetches: dict[int, tuple[Track, asyncio.Future]] = {}
+        self._control_queues: dict[int, asyncio.PriorityQueue] = {}
+        self._control_workers: dict[int, asyncio.Task] = {}
+        self._control_seq = itertools.count()
+
+    async def cog_load(self):
+        self._http = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=5),
+            connector=aiohttp.TCPConnector(limit=8),
+        )
+        # One persistent view serves every guild's panels (buttons resolve the guild from the interaction),
+        # so memory doesn't scale with guild count and buttons keep working after a restart.
+        self._control_view = ControlView(self)
+        self.bot.add_view(self._control_view)
+
+    async def cog_unload(self):
+        if self._http:
+            await self._http.close()
+        self.audio_source.close()
 
     async def ensure_voice_interaction(
         self, interaction: discord.Interaction
@@ -57,20 +158,137 @@ class Music(commands.Cog):
                     "You need to be in a voice channel first.", ephemeral=True
                 )
             return None
-        voice_client = interaction.guild.voice_client
-        if voice_client is None or not voice_client.is_connected():
-            voice_client = await interaction.user.voice.channel.connect()
-        elif voice_client.channel != interaction.user.voice.channel:
-            await voice_client.move_to(interaction.user.voice.channel)
+        guild_id = interaction.guild.id
+        target = interaction.user.voice.channel
+        # Serialize connect/move per guild so concurrent commands don't race the voice gateway.
+        async with self._voice_locks.setdefault(guild_id, asyncio.Lock()):
+            voice_client = interaction.guild.voice_client
+            if voice_client is None or not voice_client.is_connected():
+                voice_client = await target.connect()
+            elif voice_client.channel is None or voice_client.channel.id != target.id:
+                await voice_client.move_to(target)
+        self.voice_clients[guild_id] = voice_client
         return voice_client
 
+    async def _guard(
+        self, interaction: discord.Interaction, *, need_perm: bool = False, need_vc: bool = False
+    ) -> Tuple[bool, Optional[discord.VoiceClient]]:
+        # Acknowledge with a deferred update (no "thinking" placeholder); the panel edit is the feedback.
+        if not interaction.response.is_done():
+            await interaction.response.defer(thinking=False)
+        if need_perm and not self._has_permission(interaction.user):  # type: ignore
+            await interaction.followup.send("You don't have permission.", ephemeral=True)
+            return False, None
+        guild = interaction.guild
+        vc = self._voice_client_for(guild.id) if guild else None
+        if need_vc and (not vc or not vc.is_connected()):
+            await interaction.followup.send("Not connected.", ephemeral=True)
+            return False, None
+        return True, vc
+
+    def _submit_control(self, guild_id: int, priority: int, action) -> asyncio.Future:
+        # Per-guild mailbox: pending pause/skip/stop run ahead of queued bulk work like clears.
+        queue = self._control_queues.setdefault(guild_id, asyncio.PriorityQueue())
+        fut = self.bot.loop.create_future()
+        queue.put_nowait((priority, next(self._control_seq), action, fut))
+        worker = self._control_workers.get(guild_id)
+        if worker is None or worker.done():
+            self._control_workers[guild_id] = self.bot.loop.create_task(self._control_worker(guild_id))
+        return fut
+
+    async def _control_worker(self, guild_id: int):
+        queue = self._control_queues[guild_id]
+        while not queue.empty():
+            _, _, action, fut = queue.get_nowait()
+            # The awaiting caller may have been cancelled meanwhile; its future is then already done.
+            try:
+                result = await action()
+            except asyncio.CancelledError:
+                fut.cancel()
+                raise
+            except Exception as exc:
+                if not fut.done():
+                    fut.set_exception(exc)
+            else:
+                if not fut.done():
+                    fut.set_result(result)
+        self._control_workers.pop(guild_id, None)
+
+    def _voice_client_for(self, guild_id: int) -> Optional[discord.VoiceClient]:
+        vc = self.voice_clients.get(guild_id)
+        if vc is None:
+            guild = self.bot.get_guild(guild_id)
+            vc = guild.voice_client if guild else None  # type: ignore
+            if vc is not None:
+                self.voice_clients[guild_id] = vc
+        return vc
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self._forget_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if before.channel != after.channel:
+            # Membership changed; vote thresholds for both channels must be recomputed.
+            if before.channel is not None:
+                self._vote_thresholds.pop(before.channel.id, None)
+            if after.channel is not None:
+                self._vote_thresholds.pop(after.channel.id, None)
+        if self.bot.user and member.id == self.bot.user.id and after.channel is None:
+            self.voice_clients.pop(member.guild.id, None)
+            # Playback state only matters while connected; keep it bounded by active voice sessions.
+            self.playback.pop(member.guild.id, None)
+            self._embed_cache.pop(member.guild.id, None)
+            self._prefetches.pop(member.guild.id, None)
+
+    def _forget_guild(self, guild_id: int):
+        # Drop every per-guild entry so memory tracks current guilds, not every guild ever served.
+        for mapping in (
+            self.playback,
+            self.panels,
+            self.settings,
+            self.history,
+            self._embed_cache,
+            self._panel_snapshots,
+            self.voice_clients,
+            self._voice_locks,
+            self._prefetches,
+        ):
+            mapping.pop(guild_id, None)
+        self.queue_manager.forget(guild_id)
+        self._panel_update_pending.discard(guild_id)
+        self._cancel_idle_task(guild_id)
+        worker = self._control_workers.pop(guild_id, None)
+        if worker is not None:
+            worker.cancel()
+        # Resolve queued mailbox entries so button callbacks awaiting them don't hang.
+        control_queue = self._control_queues.pop(guild_id, None)
+        while control_queue is not None and not control_queue.empty():
+            _, _, _, fut = control_queue.get_nowait()
+            fut.cancel()
+
+    async def _prefetch_next(self, guild_id: int):
+        # Resolve the upcoming lazy track while this one plays so the hand-off doesn't wait on yt-dlp.
+        upcoming = await self.queue_manager.peek(guild_id)
+        if upcoming is None or upcoming.stream_url is not None:
+            return
+        pending = self._prefetches.get(guild_id)
+        if pending is not None and pending[0] is upcoming:
+            return
+        fut = asyncio.ensure_future(self.audio_source.materialize_async(upcoming))
+        # Failures surface when the track is started; just mark them retrieved here.
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._prefetches[guild_id] = (upcoming, fut)
+
     def _build_before_options(self, track: Track, start_at: int = 0) -> str:
         before_opts = BASE_FFMPEG_BEFORE
+        if ".m3u8" in track.stream_url:
+            before_opts = f"{before_opts} {LIVE_FFMPEG_BEFORE}"
         if start_at > 0:
             before_opts = f"{before_opts} -ss {start_at}"
-        if track.headers:
-            header_blob = "\r\n".join(f"{k}: {v}" for k, v in track.headers.items())
-            before_opts = f'{before_opts} -headers "{header_blob}\r\n"'
+        if track.header_option:
+            before_opts = f"{before_opts} {track.header_option}"
         return before_opts
 
     async def _start_playback(
@@ -83,34 +301,53 @@ class Music(commands.Cog):
         announce: bool = True,
         replace_panel: bool = True,
     ):
+        if track.stream_url is None:
+            prefetch = self._prefetches.pop(guild_id, None)
+            try:
+                if prefetch is not None and prefetch[0] is track:
+                    await prefetch[1]
+                else:
+                    await self.audio_source.materialize_async(track)
+            except Exception as exc:
+                self.logger.warning("Failed to load %s: %s", track.url, exc)
+                if channel:
+                    await channel.send(f"Could not load **{track.title}**, skipping.")
+                self.bot.loop.create_task(self.play_next(guild_id, channel))
+                return
         before_opts = self._build_before_options(track, start_at=start_at)
 
         def after_playback(error: Optional[Exception]):
             if error:
                 self.logger.error("Playback error: %s", error)
-            if self.skip_after.pop(guild_id, False):
+            state = self.playback[guild_id]
+            if state.skip_after:
+                state.skip_after = False
                 return
+            state.status = "idle"
             fut = self.bot.loop.create_task(self.play_next(guild_id, channel))
             fut.add_done_callback(lambda f: f.exception() if f.exception() else None)
 
-        source = discord.PCMVolumeTransformer(
-            discord.FFmpegPCMAudio(
-                track.stream_url,
-                before_options=before_opts,
-                **DEFAULT_FFMPEG_OPTIONS,
-            ),
-            volume=self.default_volume,
+        source = discord.FFmpegPCMAudio(
+            track.stream_url,
+            before_options=before_opts,
+            **DEFAULT_FFMPEG_OPTIONS,
         )
+        # At unity gain the volume transformer is a per-frame no-op, so skip it.
+        if self.default_volume != 1.0:
+            source = discord.PCMVolumeTransformer(source, volume=self.default_volume)
+        self._cancel_idle_task(guild_id)
         voice_client.play(source, after=after_playback)
-        self.current[guild_id] = track
-        now = time.monotonic()
-        self.start_times[guild_id] = now - start_at
-        self.pause_offsets[guild_id] = 0.0
-        self.pause_marks.pop(guild_id, None)
-        self.votes[guild_id] = set()
+        state = self.playback[guild_id]
+        state.current = track
+        state.start_time = time.monotonic() - start_at
+        state.pause_offset = 0.0
+        state.pause_mark = None
+        state.status = "playing"
+        state.votes = set()
         self._push_history(guild_id, track)
+        await self._prefetch_next(guild_id)
         if isinstance(channel, discord.TextChannel):
-            self.last_channel[guild_id] = channel
+            self.settings[guild_id].last_channel = channel
         if channel:
             if announce:
                 await channel.send(f"Now playing: **{track.title}** [{track.source}] requested by {track.requester}")
@@ -120,7 +357,8 @@ class Music(commands.Cog):
                 await self._update_panels(guild_id)
 
     async def play_next(self, guild_id: int, channel: discord.abc.Messageable):
-        voice_client = discord.utils.get(self.bot.voice_clients, guild__id=guild_id)
+        guild = self.bot.get_guild(guild_id)
+        voice_client = guild.voice_client if guild else None
         if voice_client is None or not voice_client.is_connected():
             return
         next_track = await self.queue_manager.pop_next(guild_id)
@@ -128,11 +366,11 @@ class Music(commands.Cog):
             await self._start_playback(guild_id, channel, voice_client, next_track)
             return
 
-        self.current[guild_id] = None
-        self._reset_progress(guild_id)
+        self._clear_current(guild_id)
         await self._update_panels(guild_id)
 
-        if self.autoplay.get(guild_id, False):
+        settings = self.settings.get(guild_id)
+        if settings and settings.autoplay:
             radio = await self._try_autoplay(guild_id, channel)
             if radio:
                 await self._start_playback(guild_id, channel, voice_client, radio)
@@ -144,19 +382,22 @@ class Music(commands.Cog):
                 await voice_client.disconnect()
                 await channel.send("Disconnected due to inactivity.")
 
-        self.bot.loop.create_task(disconnect_after_idle())
+        self._cancel_idle_task(guild_id)
+        self._idle_tasks[guild_id] = self.bot.loop.create_task(disconnect_after_idle())
 
-    def _has_permission(self, member: discord.Member) -> bool:
-        if member.guild_permissions.administrator:
-            return True
-        if member.guild.id in self.temp_djs and member.id in self.temp_djs[member.guild.id]:
-            return True
-        allowed_roles = self.config.get("allowed_roles") or []
-        if not allowed_roles:
-            return True
+    def _cancel_idle_task(self, guild_id: int):
+        task = self._idle_tasks.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    def _refresh_role_cache(self):
+        # Admin.setroles swaps in a new list, so identity tells us when to re-parse.
+        allowed_roles = self.config.get("allowed_roles")
+        if allowed_roles is self._allowed_roles_src and self._role_cache_ready:
+            return
         allowed_ids = set()
         allowed_names = set()
-        for role in allowed_roles:
+        for role in allowed_roles or []:
             if isinstance(role, int):
                 allowed_ids.add(role)
             else:
@@ -164,18 +405,46 @@ class Music(commands.Cog):
                     allowed_ids.add(int(role))
                 except (TypeError, ValueError):
                     allowed_names.add(str(role))
-        for role in member.roles:
-            if role.id in allowed_ids or role.name in allowed_names:
-                return True
-        return False
+        self._allowed_role_ids = frozenset(allowed_ids)
+        self._allowed_role_names = frozenset(allowed_names)
+        self._allowed_roles_src = allowed_roles
+        self._role_cache_ready = True
 
-    def _reset_progress(self, guild_id: int):
-        self.start_times.pop(guild_id, None)
-        self.pause_offsets.pop(guild_id, None)
-        self.pause_marks.pop(guild_id, None)
-        self.votes[guild_id] = set()
+    def _has_permission(self, member: discord.Member) -> bool:
+        if member.guild_permissions.administrator:
+            return True
+        settings = self.settings.get(member.guild.id)
+        if settings and member.id in settings.temp_djs:
+            return True
+        self._refresh_role_cache()
+        if not self._allowed_role_ids and not self._allowed_role_names:
+            return True
+        return any(r.id in self._allowed_role_ids or r.name in self._allowed_role_names for r in member.roles)
 
-    def _format_time(self, seconds: Optional[int]) -> str:
+    def _apply_volume(self, vc: Optional[discord.VoiceClient]):
+        if not vc or not vc.source:
+            return
+        if isinstance(vc.source, discord.PCMVolumeTransformer):
+            vc.source.volume = self.default_volume
+        elif self.default_volume != 1.0:
+            # Swapping the source goes through AudioPlayer.set_source, which pauses then resumes; re-pause
+            # so a paused track stays paused and matches the panel state.
+            was_paused = vc.is_paused()
+            vc.source = discord.PCMVolumeTransformer(vc.source, volume=self.default_volume)
+            if was_paused:
+                vc.pause()
+
+    @staticmethod
+    def _vc(interaction: discord.Interaction) -> Optional[discord.VoiceClient]:
+        guild = interaction.guild
+        return guild.voice_client if guild else None  # type: ignore
+
+    def _clear_current(self, guild_id: int):
+        self.playback[guild_id].reset()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _format_time(seconds: Optional[int]) -> str:
         if seconds is None:
             return "??:??"
         m, s = divmod(max(0, int(seconds)), 60)
@@ -186,32 +455,27 @@ class Music(commands.Cog):
         value = value.strip()
         if not value:
             return None
-        if ":" in value:
-            parts = value.split(":")
-            try:
-                parts = [int(p) for p in parts]
-            except ValueError:
-                return None
-            seconds = 0
-            for p in parts:
-                seconds = seconds * 60 + p
-            return seconds
         if value.isdigit():
             return int(value)
-        return None
+        if not TIMESTAMP_RE.fullmatch(value):
+            return None
+        seconds = 0
+        for part in value.split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds
 
     def _current_elapsed(self, guild_id: int) -> Optional[float]:
-        if guild_id not in self.start_times:
+        state = self.playback.get(guild_id)
+        if state is None or state.start_time is None:
             return None
-        elapsed = time.monotonic() - self.start_times[guild_id] - self.pause_offsets.get(guild_id, 0.0)
-        if guild_id in self.pause_marks:
-            elapsed = self.pause_marks[guild_id] - self.start_times.get(guild_id, 0.0) - self.pause_offsets.get(guild_id, 0.0)
-        return max(elapsed, 0.0)
+        now = state.pause_mark if state.pause_mark is not None else time.monotonic()
+        elapsed = now - state.start_time - state.pause_offset
+        return elapsed if elapsed > 0.0 else 0.0
 
     async def _handle_seek(self, interaction: discord.Interaction, target: int, mode: str):
         guild_id = interaction.guild.id
-        track = self.current.get(guild_id)
-        vc = interaction.guild.voice_client if interaction.guild else None
+        track = self.playback[guild_id].current
+        vc = self._vc(interaction)
         if not track or not vc:
             await interaction.response.send_message("Nothing is playing.", ephemeral=True)
             return
@@ -225,9 +489,9 @@ class Music(commands.Cog):
         if mode == "forward" and target <= elapsed:
             await interaction.response.send_message("Fast-forward must be later than the current time.", ephemeral=True)
             return
-        self.skip_after[guild_id] = True
+        self.playback[guild_id].skip_after = True
         vc.stop()
-        channel = self.last_channel.get(guild_id) or interaction.channel
+        channel = self.settings[guild_id].last_channel or interaction.channel
         await self._start_playback(guild_id, channel, vc, track, start_at=target, announce=False, replace_panel=False)
         if interaction.response.is_done():
             await interaction.followup.send(f"Jumped to {self._format_time(target)}.", ephemeral=True)
@@ -236,18 +500,19 @@ class Music(commands.Cog):
 
     async def _try_autoplay(self, guild_id: int, channel: discord.abc.Messageable) -> Optional[Track]:
         # Playlist-driven autoplay
-        plist_name = self.autoplay_playlist.get(guild_id)
+        settings = self.settings[guild_id]
+        plist_name = settings.autoplay_playlist
         if plist_name:
             plist = self.playlist_store.get_playlist(guild_id, plist_name)
             if plist:
-                pos = self.autoplay_playlist_pos.get(guild_id, 0) % len(plist)
+                pos = settings.autoplay_playlist_pos % len(plist)
                 for offset in range(len(plist)):
                     idx = (pos + offset) % len(plist)
                     entry = plist[idx]
                     query = entry.get("url") or entry.get("title")
                     try:
-                        track = self.audio_source.resolve(query, requester="Radio")
-                        self.autoplay_playlist_pos[guild_id] = idx + 1
+                        track = await self.audio_source.resolve_async(query, "Radio")
+                        settings.autoplay_playlist_pos = idx + 1
                         track.source = entry.get("source", track.source)
                         return track
                     except Exception:
@@ -255,40 +520,24 @@ class Music(commands.Cog):
                 await channel.send("Autoplay playlist items failed to load.")
             else:
                 await channel.send("Autoplay playlist not found; turning off playlist autoplay.")
-                self.autoplay_playlist[guild_id] = None
+                settings.autoplay_playlist = None
 
-        last = self.history.get(guild_id, [])
+        last = self.history.get(guild_id)
         if not last:
             return None
         seed = last[-1]
-        history_urls = {t.url for t in last[-15:]}
-        seed_id = self._youtube_id(seed.url)
+        history_urls = {t.url for t in itertools.islice(reversed(last), 15)}
+        seed_id = seed.youtube_id
         candidate_urls: List[str] = []
 
         if self.youtube_api_key and seed_id:
-            params = {
-                "part": "snippet",
-                "maxResults": 8,
-                "type": "video",
-                "key": self.youtube_api_key,
-                "relatedToVideoId": seed_id,
-            }
-            try:
-                resp = await asyncio.to_thread(
-                    requests.get,
-                    "https://www.googleapis.com/youtube/v3/search",
-                    params=params,
-                    timeout=6,
-                )
-                if resp.ok:
-                    data = resp.json()
-                    for item in data.get("items", []):
-                        vid = item["id"]["videoId"]
-                        url = f"https://www.youtube.com/watch?v={vid}"
-                        if url not in history_urls:
-                            candidate_urls.append(url)
-            except Exception:
-                pass
+            related = await self._related_urls(seed_id)
+            # Keep only a few fresh candidates; each one costs a full yt-dlp resolve.
+            for url in dict.fromkeys(related):
+                if url not in history_urls:
+                    candidate_urls.append(url)
+                    if len(candidate_urls) >= AUTOPLAY_CANDIDATES:
+                        break
 
         # If no related results, fall back to artist/title search
         if not candidate_urls:
@@ -296,76 +545,83 @@ class Music(commands.Cog):
             search_query = f"{artist_hint} music"[:150]
             candidate_urls.append(f"ytsearch1:{search_query}")
 
-        for url in candidate_urls:
-            if url in history_urls:
-                continue
-            try:
-                return self.audio_source.resolve(url, requester="Radio")
-            except Exception:
-                continue
+        # Resolve candidates concurrently off the loop and take the first one that succeeds.
+        pending = [
+            asyncio.ensure_future(self.audio_source.resolve_async(url, "Radio"))
+            for url in candidate_urls
+        ]
+        try:
+            for fut in asyncio.as_completed(pending):
+                try:
+                    return await fut
+                except Exception:
+                    continue
+        finally:
+            for fut in pending:
+                fut.cancel()
 
         await channel.send("Autoplay failed to find a next track.")
         return None
 
+    async def _related_urls(self, seed_id: str) -> List[str]:
+        cached = self._related_cache.get(seed_id)
+        if cached is not None:
+            return cached
+        params = {
+            "part": "snippet",
+            "maxResults": 8,
+            "type": "video",
+            "key": self.youtube_api_key,
+            "relatedToVideoId": seed_id,
+        }
+        try:
+            async with self._http.get(
+                YOUTUBE_SEARCH_URL, params=params, timeout=aiohttp.ClientTimeout(total=6)
+            ) as resp:
+                if resp.status != 200:
+                    return []
+                data = await resp.json()
+        except Exception:
+            return []
+        urls = [f"https://www.youtube.com/watch?v={item['id']['videoId']}" for item in data.get("items", [])]
+        # Empty answers are cached briefly so a dead seed doesn't burn quota on every idle queue.
+        self._related_cache.set(seed_id, urls, ttl=None if urls else RELATED_EMPTY_TTL)
+        return urls
+
     def _progress(self, guild_id: int, duration: Optional[int]) -> tuple[str, str]:
         if duration is None or duration <= 0:
-            return "🔘 " + ("▬" * 18), "?:?? / ??:??"
-        elapsed = 0.0
-        if guild_id in self.start_times:
-            elapsed = time.monotonic() - self.start_times[guild_id] - self.pause_offsets.get(guild_id, 0.0)
-        if guild_id in self.pause_marks:
-            elapsed = self.pause_marks[guild_id] - self.start_times.get(guild_id, 0.0) - self.pause_offsets.get(guild_id, 0.0)
-        elapsed = max(0.0, min(float(duration), elapsed))
+            return UNKNOWN_PROGRESS
+        elapsed = min(float(duration), self._current_elapsed(guild_id) or 0.0)
         ratio = elapsed / float(duration) if duration else 0.0
-        total_slots = 18
-        filled = min(total_slots - 1, max(0, math.floor(ratio * total_slots)))
-        bar = "".join("▬" if i != filled else "🔘" for i in range(total_slots))
-        return bar, f"{self._format_time(int(elapsed))} / {self._format_time(duration)}"
+        filled = min(PROGRESS_SLOTS - 1, int(ratio * PROGRESS_SLOTS))
+        return PROGRESS_BARS[filled], f"{self._format_time(int(elapsed))} / {self._format_time(duration)}"
 
     def _thumbnail_for(self, track: Track) -> Optional[str]:
-        if "youtube.com/watch?v=" in track.url or "youtu.be/" in track.url:
-            vid = None
-            if "watch?v=" in track.url:
-                vid = track.url.split("watch?v=")[-1].split("&")[0]
-            elif "youtu.be/" in track.url:
-                vid = track.url.split("youtu.be/")[-1].split("?")[0]
-            if vid:
-                return f"https://img.youtube.com/vi/{vid}/hqdefault.jpg"
-        return None
-
-    def _youtube_id(self, url: str) -> Optional[str]:
-        if "youtube.com/watch?v=" in url:
-            return url.split("watch?v=")[-1].split("&")[0]
-        if "youtu.be/" in url:
-            return url.split("youtu.be/")[-1].split("?")[0]
-        return None
+        return track.thumbnail_url
 
     def _push_history(self, guild_id: int, track: Track, limit: int = 50):
-        hist = self.history.setdefault(guild_id, [])
+        hist = self.history.get(guild_id)
+        if hist is None:
+            hist = self.history[guild_id] = deque(maxlen=limit)
         hist.append(track)
-        if len(hist) > limit:
-            del hist[:-limit]
-
-    def _serialize_track(self, track: Track) -> dict:
-        return {
-            "title": track.title,
-            "url": track.url,
-            "duration": track.duration,
-            "source": track.source,
-        }
 
     def _calc_required_votes(self, vc: discord.VoiceClient) -> int:
-        humans = [m for m in vc.channel.members if not m.bot]
-        count = max(1, len(humans))
-        return max(1, math.ceil(count / 2))
+        channel_id = vc.channel.id
+        required = self._vote_thresholds.get(channel_id)
+        if required is None:
+            humans = [m for m in vc.channel.members if not m.bot]
+            count = max(1, len(humans))
+            required = self._vote_thresholds[channel_id] = max(1, (count + 1) // 2)
+        return required
 
     def _build_now_playing_embed(self, guild_id: int) -> discord.Embed:
-        track = self.current.get(guild_id)
+        track = self.playback[guild_id].current
         if not track:
-            embed = discord.Embed(title="Nothing Playing", description="Queue is empty.", color=0x2b2d31)
-            embed.set_footer(text="Use /play or /search to add a track.")
-            return embed
+            return self._idle_embed
         bar, progress_text = self._progress(guild_id, track.duration)
+        cached = self._embed_cache.get(guild_id)
+        if cached and cached[0] is track and cached[1] == bar and cached[2] == progress_text:
+            return cached[3]
         desc_lines = [
             f"**[{track.title}]({track.url})**",
             f"{bar}",
@@ -382,15 +638,14 @@ class Music(commands.Cog):
         if thumb:
             embed.set_thumbnail(url=thumb)
         embed.set_footer(text="Use the controls below to manage playback.")
+        self._embed_cache[guild_id] = (track, bar, progress_text, embed)
         return embed
 
     async def _delete_panels(self, guild_id: int):
-        for msg in list(self.panels.get(guild_id, [])):
-            try:
-                await msg.delete()
-            except Exception:
-                pass
-        self.panels[guild_id] = []
+        msgs = list(self.panels.get(guild_id, {}).values())
+        self.panels[guild_id] = {}
+        self._panel_snapshots.pop(guild_id, None)
+        await asyncio.gather(*(msg.delete() for msg in msgs), return_exceptions=True)
 
     async def _send_panel(self, guild_id: int, channel: Optional[discord.abc.Messageable], replace: bool = True):
         if channel is None:
@@ -398,7 +653,7 @@ class Music(commands.Cog):
         if replace:
             await self._delete_panels(guild_id)
         embed = self._build_now_playing_embed(guild_id)
-        view = ControlView(self, guild_id)
+        view = self._control_view
         try:
             msg = await channel.send(embed=embed, view=view)
             self._register_panel(guild_id, msg)
@@ -415,18 +670,118 @@ class Music(commands.Cog):
         if guild_id not in self.panels:
             return
         embed = self._build_now_playing_embed(guild_id)
-        view_factory = lambda: ControlView(self, guild_id)
-        alive = []
-        for msg in list(self.panels.get(guild_id, [])):
-            try:
-                await msg.edit(embed=embed, view=view_factory())
-                alive.append(msg)
-            except Exception:
-                continue
-        self.panels[guild_id] = alive
+        view = self._control_view
+        # The embed is cached while nothing visible changes, so identity means the panels are already current.
+        snapshot = self._panel_snapshots.get(guild_id)
+        if snapshot and snapshot[0] is embed and snapshot[1] is view:
+            return
+        panels = self.panels[guild_id]
+        msgs = list(panels.values())
+        results = await asyncio.gather(*(msg.edit(embed=embed, view=view) for msg in msgs), return_exceptions=True)
+        for msg, result in zip(msgs, results):
+            if isinstance(result, Exception):
+                panels.pop(msg.id, None)
+        self._panel_snapshots[guild_id] = (embed, view)
+
+    def _schedule_panel_update(self, guild_id: int):
+        # Collapse bursts of state changes into one trailing panel edit per guild per tick.
+        self._panel_update_pending.add(guild_id)
+        if self._panel_update_task is None or self._panel_update_task.done():
+            self._panel_update_task = self.bot.loop.create_task(self._run_panel_updates())
+
+    async def _run_panel_updates(self):
+        while self._panel_update_pending:
+            await asyncio.sleep(PANEL_UPDATE_DELAY)
+            pending, self._panel_update_pending = self._panel_update_pending, set()
+            results = await asyncio.gather(*(self._update_panels(g) for g in pending), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.logger.warning("Failed to update panels: %s", result)
+
+    async def _resolve_many(self, queries: List[str], requester: str) -> List[Optional[Track]]:
+        # Overlap the network waits but keep a bounded number in flight; results keep input order.
+        sem = asyncio.Semaphore(PLAYLIST_RESOLVE_CONCURRENCY)
+
+        async def bounded(query: str) -> Optional[Track]:
+            async with sem:
+                try:
+                    return await self.audio_source.resolve_async(query, requester)
+                except Exception:
+                    return None
+
+        # Playlists often repeat entries; resolve each distinct query once and fan the result back out.
+        unique = list(dict.fromkeys(queries))
+        resolved = dict(zip(unique, await asyncio.gather(*(bounded(query) for query in unique))))
+        results: List[Optional[Track]] = []
+        seen: set[str] = set()
+        for query in queries:
+            track = resolved[query]
+            if track is not None and query in seen:
+                track = dataclasses.replace(track)
+            seen.add(query)
+            results.append(track)
+        return results
+
+    async def _tracks_for_entries(self, entries: List[dict], requester: str) -> List[Optional[Track]]:
+        # Entries with a URL skip yt-dlp entirely here; their stream is resolved when they start playing.
+        tracks = [self.audio_source.unresolved_track(entry, requester) for entry in entries]
+        pending = [
+            (i, entries[i].get("query") or entries[i].get("title"))
+            for i, track in enumerate(tracks)
+            if track is None
+        ]
+        pending = [(i, query) for i, query in pending if query]
+        resolved = await self._resolve_many([query for _, query in pending], requester)
+        for (i, _), track in zip(pending, resolved):
+            tracks[i] = track
+        return tracks
 
     def _register_panel(self, guild_id: int, message: discord.Message):
-        self.panels.setdefault(guild_id, []).append(message)
+        self.panels.setdefault(guild_id, {})[message.id] = message
+        # The snapshot describes the panels it last edited; a newly posted one may differ, so force the next edit.
+        self._panel_snapshots.pop(guild_id, None)
+
+    async def _enqueue_and_play(
+        self,
+        guild_id: int,
+        channel: Optional[discord.abc.Messageable],
+        voice_client: discord.VoiceClient,
+        track: Track,
+    ) -> Optional[bool]:
+        # True: started now, False: queued behind current track, None: queue full.
+        idle = not voice_client.is_playing() and not voice_client.is_paused()
+        if idle and await self.queue_manager.is_empty(guild_id):
+            await self._start_playback(guild_id, channel, voice_client, track)
+            return True
+        added = await self.queue_manager.add_track(guild_id, track)
+        if not added:
+            return None
+        if idle:
+            next_track = await self.queue_manager.pop_next(guild_id) or track
+            await self._start_playback(guild_id, channel, voice_client, next_track)
+            return True
+        return False
+
+    async def _play_query(self, interaction: discord.Interaction, query: str):
+        voice_client = await self.ensure_voice_interaction(interaction)
+        if not voice_client:
+            return
+        guild_id = interaction.guild.id
+        self.settings[guild_id].last_channel = interaction.channel  # type: ignore
+        await interaction.response.defer(thinking=True)
+        try:
+            track = await self.audio_source.resolve_async(query, str(interaction.user))
+        except Exception as exc:
+            await interaction.followup.send(f"Could not get audio: {exc}", ephemeral=True)
+            return
+        started = await self._enqueue_and_play(guild_id, interaction.channel, voice_client, track)  # type: ignore
+        if started is None:
+            await interaction.followup.send("Queue is full.", ephemeral=True)
+        elif started:
+            await interaction.followup.send(f"Now playing **{track.title}**", ephemeral=False)
+        else:
+            await interaction.followup.send(f"Queued **{track.title}**", ephemeral=False)
+            await self._ensure_panel_exists(guild_id, interaction.channel)  # type: ignore
 
     # Slash commands
     @app_commands.command(name="join", description="Bot joins your voice channel.")
@@ -437,7 +792,7 @@ class Music(commands.Cog):
 
     @app_commands.command(name="leave", description="Bot leaves the voice channel.")
     async def leave(self, interaction: discord.Interaction):
-        vc = interaction.guild.voice_client if interaction.guild else None
+        vc = self._vc(interaction)
         if vc:
             await vc.disconnect()
             await interaction.response.send_message("Left the voice channel.", ephemeral=True)
@@ -447,88 +802,63 @@ class Music(commands.Cog):
     @app_commands.command(name="play", description="Play or queue a track from a URL or search term.")
     @app_commands.describe(query="YouTube/Spotify/SoundCloud URL or search text")
     async def play(self, interaction: discord.Interaction, query: str):
-        voice_client = await self.ensure_voice_interaction(interaction)
-        if not voice_client:
-            return
-        self.last_channel[interaction.guild.id] = interaction.channel  # type: ignore
-        await interaction.response.defer(thinking=True)
-        try:
-            track = self.audio_source.resolve(query, requester=str(interaction.user))
-        except Exception as exc:
-            await interaction.followup.send(f"Could not get audio: {exc}", ephemeral=True)
-            return
-
-        added = await self.queue_manager.add_track(interaction.guild.id, track)
-        if not added:
-            await interaction.followup.send("Queue is full.", ephemeral=True)
-            return
-
-        if not voice_client.is_playing() and not voice_client.is_paused():
-            next_track = await self.queue_manager.pop_next(interaction.guild.id) or track
-            await self._start_playback(interaction.guild.id, interaction.channel, voice_client, next_track)  # type: ignore
-            await interaction.followup.send(f"Now playing **{track.title}**", ephemeral=False)
-        else:
-            await interaction.followup.send(f"Queued **{track.title}**", ephemeral=False)
-            await self._ensure_panel_exists(interaction.guild.id, interaction.channel)  # type: ignore
+        await self._play_query(interaction, query)
 
     @app_commands.command(name="pause", description="Pause playback.")
     async def pause(self, interaction: discord.Interaction):
-        vc = interaction.guild.voice_client if interaction.guild else None
+        guild_id = interaction.guild.id
+        vc = self._vc(interaction)
         if vc and vc.is_playing():
             vc.pause()
-            self.pause_marks[interaction.guild.id] = time.monotonic()
+            self.playback[guild_id].mark_paused(time.monotonic())
             await interaction.response.send_message("Paused playback.", ephemeral=True)
-            await self._update_panels(interaction.guild.id)
+            self._schedule_panel_update(guild_id)
         else:
             await interaction.response.send_message("Nothing is playing.", ephemeral=True)
 
     @app_commands.command(name="resume", description="Resume playback.")
     async def resume(self, interaction: discord.Interaction):
-        vc = interaction.guild.voice_client if interaction.guild else None
+        guild_id = interaction.guild.id
+        vc = self._vc(interaction)
         if vc and vc.is_paused():
-            now = time.monotonic()
-            paused_at = self.pause_marks.pop(interaction.guild.id, None)
-            if paused_at:
-                self.pause_offsets[interaction.guild.id] = self.pause_offsets.get(interaction.guild.id, 0.0) + (
-                    now - paused_at
-                )
+            self.playback[guild_id].mark_resumed(time.monotonic())
             vc.resume()
             await interaction.response.send_message("Resumed playback.", ephemeral=True)
-            await self._update_panels(interaction.guild.id)
+            self._schedule_panel_update(guild_id)
         else:
             await interaction.response.send_message("Nothing is paused.", ephemeral=True)
 
     @app_commands.command(name="skip", description="Skip the current track.")
     async def skip(self, interaction: discord.Interaction):
-        vc = interaction.guild.voice_client if interaction.guild else None
+        vc = self._vc(interaction)
         if not vc or not vc.is_connected():
             await interaction.response.send_message("Not connected to a voice channel.", ephemeral=True)
             return
         vc.stop()
         await interaction.response.send_message("Skipped.", ephemeral=True)
-        await self._update_panels(interaction.guild.id)
+        self._schedule_panel_update(interaction.guild.id)
 
     @app_commands.command(name="stop", description="Stop playback and clear the queue.")
     async def stop(self, interaction: discord.Interaction):
+        guild_id = interaction.guild.id
         if not self._has_permission(interaction.user):  # type: ignore
             await interaction.response.send_message("You don't have permission to use this command.", ephemeral=True)
             return
-        vc = interaction.guild.voice_client if interaction.guild else None
+        vc = self._vc(interaction)
         if vc:
-            await self.queue_manager.clear(interaction.guild.id)
+            await self.queue_manager.clear(guild_id)
             vc.stop()
-            self.current[interaction.guild.id] = None
-            self._reset_progress(interaction.guild.id)
+            self._clear_current(guild_id)
             await interaction.response.send_message("Stopped playback and cleared the queue.", ephemeral=True)
-            await self._update_panels(interaction.guild.id)
-            await self._delete_panels(interaction.guild.id)
+            await self._delete_panels(guild_id)
         else:
             await interaction.response.send_message("Not connected to a voice channel.", ephemeral=True)
 
     @app_commands.command(name="queue", description="Show the current queue.")
     async def show_queue(self, interaction: discord.Interaction):
-        items = await self.queue_manager.list_queue(interaction.guild.id)
-        current = self.current.get(interaction.guild.id)
+        guild_id = interaction.guild.id
+        items = await self.queue_manager.list_queue(guild_id)
+        current = self.playback[guild_id].current
         if not items and not current:
             await interaction.response.send_message("Queue is empty.", ephemeral=True)
             return
@@ -544,7 +874,7 @@ class Music(commands.Cog):
 
     @app_commands.command(name="nowplaying", description="Show the currently playing track.")
     async def now_playing(self, interaction: discord.Interaction):
-        current = self.current.get(interaction.guild.id)
+        current = self.playback[interaction.guild.id].current
         if not current:
             await interaction.response.send_message("Nothing is playing.", ephemeral=True)
             return
@@ -559,48 +889,48 @@ class Music(commands.Cog):
         if level < 0 or level > 100:
             await interaction.response.send_message("Volume must be between 0 and 100.", ephemeral=True)
             return
-        vc = interaction.guild.voice_client if interaction.guild else None
+        vc = self._vc(interaction)
         self.default_volume = level / 100
-        if vc and vc.source and isinstance(vc.source, discord.PCMVolumeTransformer):
-            vc.source.volume = self.default_volume
+        self._apply_volume(vc)
         await interaction.response.send_message(f"Volume set to {level}%.", ephemeral=True)
-        await self._update_panels(interaction.guild.id)
+        self._schedule_panel_update(interaction.guild.id)
 
     @app_commands.command(name="clear", description="Clear the queue.")
     async def clear(self, interaction: discord.Interaction):
+        guild_id = interaction.guild.id
         if not self._has_permission(interaction.user):  # type: ignore
             await interaction.response.send_message("You don't have permission to clear the queue.", ephemeral=True)
             return
-        await self.queue_manager.clear(interaction.guild.id)
+        await self.queue_manager.clear(guild_id)
         await interaction.response.send_message("Cleared the queue.", ephemeral=True)
-        await self._update_panels(interaction.guild.id)
+        self._schedule_panel_update(guild_id)
 
     @app_commands.command(name="history", description="Show recently played tracks.")
     async def history_cmd(self, interaction: discord.Interaction):
-        hist = list(self.history.get(interaction.guild.id, []))[-10:]
+        hist = self.history.get(interaction.guild.id)
         if not hist:
             await interaction.response.send_message("No history yet.", ephemeral=True)
             return
-        lines = [f"{idx}. {t.title} [{t.source}]" for idx, t in enumerate(hist[::-1], 1)]
+        lines = [f"{idx}. {t.title} [{t.source}]" for idx, t in enumerate(itertools.islice(reversed(hist), 10), 1)]
         embed = discord.Embed(title="Recently Played", description="\n".join(lines), color=0x5865F2)
         await interaction.response.send_message(embed=embed, ephemeral=False)
 
     @app_commands.command(name="autoplay", description="Toggle autoplay/radio when queue ends.")
     @app_commands.describe(enabled="Turn autoplay on or off")
     async def autoplay_cmd(self, interaction: discord.Interaction, enabled: bool):
-        self.autoplay[interaction.guild.id] = enabled
+        self.settings[interaction.guild.id].autoplay = enabled
         await interaction.response.send_message(f"Autoplay {'enabled' if enabled else 'disabled'}.", ephemeral=True)
 
     @app_commands.command(name="vskip", description="Vote to skip the current track.")
     async def vskip(self, interaction: discord.Interaction):
-        vc = interaction.guild.voice_client if interaction.guild else None
+        vc = self._vc(interaction)
         if not vc or not vc.is_connected() or not vc.channel:
             await interaction.response.send_message("Not connected to a voice channel.", ephemeral=True)
             return
         if self._has_permission(interaction.user):  # DJs/admins should just use /skip
             await interaction.response.send_message("You can use /skip directly.", ephemeral=True)
             return
-        voters = self.votes.setdefault(interaction.guild.id, set())
+        voters = self.playback[interaction.guild.id].votes
         if interaction.user.id in voters:
             await interaction.response.send_message("You already voted to skip.", ephemeral=True)
             return
@@ -609,7 +939,7 @@ class Music(commands.Cog):
         if len(voters) >= required:
             vc.stop()
             await interaction.response.send_message("Vote threshold reached. Skipping...", ephemeral=False)
-            await self._update_panels(interaction.guild.id)
+            self._schedule_panel_update(interaction.guild.id)
         else:
             await interaction.response.send_message(
                 f"Vote recorded ({len(voters)}/{required}).", ephemeral=True
@@ -620,7 +950,7 @@ class Music(commands.Cog):
         if not self._has_permission(interaction.user):  # type: ignore
             await interaction.response.send_message("You don't have permission.", ephemeral=True)
             return
-        self.temp_djs.setdefault(interaction.guild.id, set()).add(member.id)
+        self.settings[interaction.guild.id].temp_djs.add(member.id)
         await interaction.response.send_message(f"{member.mention} is now a DJ for this session.", ephemeral=True)
 
     @app_commands.command(name="djremove", description="Remove a temporary DJ (admin/DJ only).")
@@ -628,25 +958,24 @@ class Music(commands.Cog):
         if not self._has_permission(interaction.user):  # type: ignore
             await interaction.response.send_message("You don't have permission.", ephemeral=True)
             return
-        self.temp_djs.setdefault(interaction.guild.id, set()).discard(member.id)
+        self.settings[interaction.guild.id].temp_djs.discard(member.id)
         await interaction.response.send_message(f"{member.mention} removed from DJ list.", ephemeral=True)
 
     @app_commands.command(name="djlist", description="List temporary DJs for this server.")
     async def dj_list(self, interaction: discord.Interaction):
-        ids = self.temp_djs.get(interaction.guild.id, set())
+        settings = self.settings.get(interaction.guild.id)
+        ids = settings.temp_djs if settings else set()
         if not ids:
             await interaction.response.send_message("No temporary DJs set.", ephemeral=True)
             return
-        mentions = []
-        for mid in ids:
-            member = interaction.guild.get_member(mid)
-            mentions.append(member.mention if member else f"<@{mid}>")
-        await interaction.response.send_message("Temporary DJs: " + ", ".join(mentions), ephemeral=True)
+        # Member.mention is just "<@id>", so build it directly; no member lookups or fetches needed.
+        mentions = ", ".join(f"<@{mid}>" for mid in ids)
+        await interaction.response.send_message("Temporary DJs: " + mentions, ephemeral=True)
 
     @app_commands.command(name="panel", description="Show an interactive player panel with controls.")
     async def panel(self, interaction: discord.Interaction):
         embed = self._build_now_playing_embed(interaction.guild.id)
-        view = ControlView(self, interaction.guild.id)
+        view = self._control_view
         await interaction.response.send_message(embed=embed, view=view, ephemeral=False)
         msg = await interaction.original_response()
         self._register_panel(interaction.guild.id, msg)
@@ -655,55 +984,48 @@ class Music(commands.Cog):
     @app_commands.command(name="search", description="Search YouTube and play the selected track.")
     @app_commands.describe(query="Search term")
     async def search(self, interaction: discord.Interaction, query: str):
-        voice_client = await self.ensure_voice_interaction(interaction)
-        if not voice_client:
-            return
-        self.last_channel[interaction.guild.id] = interaction.channel  # type: ignore
-        await interaction.response.defer(thinking=True)
-        try:
-            track = self.audio_source.resolve(query, requester=str(interaction.user))
-        except Exception as exc:
-            await interaction.followup.send(f"Could not get audio: {exc}", ephemeral=True)
-            return
-        added = await self.queue_manager.add_track(interaction.guild.id, track)
-        if not added:
-            await interaction.followup.send("Queue is full.", ephemeral=True)
-            return
-        if not voice_client.is_playing() and not voice_client.is_paused():
-            next_track = await self.queue_manager.pop_next(interaction.guild.id) or track
-            await self._start_playback(interaction.guild.id, interaction.channel, voice_client, next_track)  # type: ignore
-            await interaction.followup.send(f"Now playing **{track.title}**", ephemeral=False)
-        else:
-            await interaction.followup.send(f"Queued **{track.title}**", ephemeral=False)
-            await self._ensure_panel_exists(interaction.guild.id, interaction.channel)  # type: ignore
+        await self._play_query(interaction, query)
 
     @search.autocomplete("query")
     async def query_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        if not current or not self.youtube_api_key:
+        if len(current.strip()) < 2 or not self.youtube_api_key:
             return []
-
-        def fetch_suggestions() -> List[app_commands.Choice[str]]:
-            params = {
-                "part": "snippet",
-                "maxResults": 5,
-                "q": current,
-                "type": "video",
-                "key": self.youtube_api_key,
-            }
-            resp = requests.get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=5)
-            if not resp.ok:
-                return []
-            data = resp.json()
-            choices: List[app_commands.Choice[str]] = []
-            for item in data.get("items", []):
-                title = item["snippet"]["title"]
-                video_id = item["id"]["videoId"]
-                full_title = f"{title}"
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                choices.append(app_commands.Choice(name=full_title[:100], value=url))
-            return choices
-
-        return await asyncio.to_thread(fetch_suggestions)
+        key = current.strip().lower()
+        cached = self._ac_cache.get(key)
+        if cached is not None:
+            return cached
+
+        params = {
+            "part": "snippet",
+            "maxResults": 5,
+            "q": current,
+            "type": "video",
+            "key": self.youtube_api_key,
+        }
+        stale = self._ac_etags.get(key)
+        headers = {"If-None-Match": stale[0]} if stale else None
+        try:
+            async with self._http.get(YOUTUBE_SEARCH_URL, params=params, headers=headers) as resp:
+                if resp.status == 304 and stale:
+                    self._ac_cache.set(key, stale[1])
+                    return stale[1]
+                if resp.status != 200:
+                    return []
+                etag = resp.headers.get("ETag")
+                data = await resp.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return []
+        choices: List[app_commands.Choice[str]] = []
+        for item in data.get("items", []):
+            title = item["snippet"]["title"]
+            video_id = item["id"]["videoId"]
+            full_title = f"{title}"
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            choices.append(app_commands.Choice(name=full_title[:100], value=url))
+        self._ac_cache.set(key, choices)
+        if etag:
+            self._ac_etags.set(key, (etag, choices))
+        return choices
 
     @app_commands.command(name="playlist_save", description="Save the current queue as a playlist.")
     @app_commands.describe(name="Playlist name")
@@ -711,12 +1033,9 @@ class Music(commands.Cog):
         if not self._has_permission(interaction.user):  # type: ignore
             await interaction.response.send_message("You don't have permission.", ephemeral=True)
             return
-        current = self.current.get(interaction.guild.id)
+        current = self.playback[interaction.guild.id].current
         queue = await self.queue_manager.list_queue(interaction.guild.id)
-        tracks = []
-        if current:
-            tracks.append(self._serialize_track(current))
-        tracks.extend(self._serialize_track(t) for t in queue)
+        tracks = [t.to_dict() for t in (current, *queue) if t is not None]
         if not tracks:
             await interaction.response.send_message("Nothing to save.", ephemeral=True)
             return
@@ -754,16 +1073,8 @@ class Music(commands.Cog):
         if not vc:
             return
         await interaction.response.defer(thinking=True)
-        added_count = 0
-        for entry in data:
-            query = entry.get("url") or entry.get("title")
-            try:
-                track = self.audio_source.resolve(query, requester=str(interaction.user))
-            except Exception:
-                continue
-            added = await self.queue_manager.add_track(interaction.guild.id, track)
-            if added:
-                added_count += 1
+        tracks = await self._tracks_for_entries(data, str(interaction.user))
+        added_count = await self.queue_manager.add_tracks(interaction.guild.id, tracks)
         if added_count == 0:
             await interaction.followup.send("Nothing added from playlist.", ephemeral=True)
             return
@@ -781,11 +1092,11 @@ class Music(commands.Cog):
             return
         await interaction.response.defer(thinking=True, ephemeral=True)
         try:
-            track = self.audio_source.resolve(query, requester=str(interaction.user))
+            track = await self.audio_source.resolve_async(query, str(interaction.user))
         except Exception as exc:
             await interaction.followup.send(f"Could not resolve track: {exc}", ephemeral=True)
             return
-        self.playlist_store.append_track(interaction.guild.id, name, self._serialize_track(track))
+        self.playlist_store.append_track(interaction.guild.id, name, track.to_dict())
         await interaction.followup.send(f"Added **{track.title}** to playlist '{name}'.", ephemeral=True)
 
     @app_commands.command(name="playlist_import", description="Import tracks from a Spotify or YouTube playlist into a named playlist.")
@@ -795,21 +1106,15 @@ class Music(commands.Cog):
             await interaction.response.send_message("You don't have permission.", ephemeral=True)
             return
         await interaction.response.defer(thinking=True, ephemeral=True)
-        entries = self.audio_source.fetch_playlist_entries(url, limit=75)
+        entries = await self.audio_source.fetch_playlist_entries_async(url, 75)
         if not entries:
             await interaction.followup.send("Could not read that playlist.", ephemeral=True)
             return
-        added = 0
-        for entry in entries:
-            query = entry.get("url") or entry.get("query") or entry.get("title")
-            if not query:
-                continue
-            try:
-                track = self.audio_source.resolve(query, requester=str(interaction.user))
-            except Exception:
-                continue
-            self.playlist_store.append_track(interaction.guild.id, name, self._serialize_track(track))
-            added += 1
+        tracks = await self._tracks_for_entries(entries, str(interaction.user))
+        serialized = [t.to_dict() for t in tracks if t is not None]
+        # One rewrite of the store for the whole import instead of one per track.
+        self.playlist_store.append_tracks(interaction.guild.id, name, serialized)
+        added = len(serialized)
         if added == 0:
             await interaction.followup.send("No tracks could be imported.", ephemeral=True)
         else:
@@ -835,17 +1140,19 @@ class Music(commands.Cog):
     @app_commands.describe(name="Playlist name or 'off'")
     async def playlist_autoplay(self, interaction: discord.Interaction, name: str):
         if name.lower() in ("off", "none"):
-            self.autoplay_playlist[interaction.guild.id] = None
-            self.autoplay_playlist_pos[interaction.guild.id] = 0
+            settings = self.settings[interaction.guild.id]
+            settings.autoplay_playlist = None
+            settings.autoplay_playlist_pos = 0
             await interaction.response.send_message("Playlist autoplay disabled.", ephemeral=True)
             return
         data = self.playlist_store.get_playlist(interaction.guild.id, name)
         if not data:
             await interaction.response.send_message("Playlist not found.", ephemeral=True)
             return
-        self.autoplay_playlist[interaction.guild.id] = name
-        self.autoplay_playlist_pos[interaction.guild.id] = 0
-        self.autoplay[interaction.guild.id] = True
+        settings = self.settings[interaction.guild.id]
+        settings.autoplay_playlist = name
+        settings.autoplay_playlist_pos = 0
+        settings.autoplay = True
         await interaction.response.send_message(f"Autoplay will use playlist '{name}'.", ephemeral=True)
 
     @app_commands.command(name="help", description="Show bot help and onboarding.")
@@ -878,7 +1185,7 @@ class SeekModal(discord.ui.Modal):
         self.add_item(self.timestamp)
 
     async def on_submit(self, interaction: discord.Interaction):
-        seconds = self.cog._parse_timestamp(str(self.timestamp))
+        seconds = self.cog._parse_timestamp(self.timestamp.value)
         if seconds is None:
             await interaction.response.send_message("Invalid time format.", ephemeral=True)
             return
@@ -901,7 +1208,7 @@ class VolumeModal(discord.ui.Modal):
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            value = int(str(self.level))
+            value = int(self.level.value.strip())
         except ValueError:
             await interaction.response.send_message("Please enter a number between 0 and 100.", ephemeral=True)
             return
@@ -909,11 +1216,10 @@ class VolumeModal(discord.ui.Modal):
             await interaction.response.send_message("Volume must be between 0 and 100.", ephemeral=True)
             return
         self.cog.default_volume = value / 100
-        vc = interaction.guild.voice_client if interaction.guild else None
-        if vc and vc.source and isinstance(vc.source, discord.PCMVolumeTransformer):
-            vc.source.volume = self.cog.default_volume
+        vc = self.cog._vc(interaction)
+        self.cog._apply_volume(vc)
         await interaction.response.send_message(f"Volume set to {value}%.", ephemeral=True)
-        await self.cog._update_panels(self.guild_id)
+        self.cog._schedule_panel_update(self.guild_id)
 
 
 class SearchModal(discord.ui.Modal):
@@ -931,118 +1237,107 @@ class SearchModal(discord.ui.Modal):
         self.add_item(self.query)
 
     async def on_submit(self, interaction: discord.Interaction):
-        voice_client = await self.cog.ensure_voice_interaction(interaction)
-        if not voice_client:
-            return
-        self.cog.last_channel[interaction.guild.id] = interaction.channel  # type: ignore
-        try:
-            track = self.cog.audio_source.resolve(str(self.query), requester=str(interaction.user))
-        except Exception as exc:
-            await interaction.response.send_message(f"Could not get audio: {exc}", ephemeral=True)
-            return
-        added = await self.cog.queue_manager.add_track(interaction.guild.id, track)
-        if not added:
-            await interaction.response.send_message("Queue is full.", ephemeral=True)
-            return
-        if not voice_client.is_playing() and not voice_client.is_paused():
-            next_track = await self.cog.queue_manager.pop_next(interaction.guild.id) or track
-            await self.cog._start_playback(interaction.guild.id, interaction.channel, voice_client, next_track)  # type: ignore
-            await interaction.response.send_message(f"Now playing **{track.title}**", ephemeral=False)
-        else:
-            await interaction.response.send_message(f"Queued **{track.title}**", ephemeral=False)
-            await self.cog._ensure_panel_exists(interaction.guild.id, interaction.channel)  # type: ignore
+        await self.cog._play_query(interaction, self.query.value)
+
 
 class ControlView(discord.ui.View):
-    def __init__(self, cog: Music, guild_id: int):
-        super().__init__(timeout=600)
+    def __init__(self, cog: Music):
+        super().__init__(timeout=None)
         self.cog = cog
-        self.guild_id = guild_id
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
-        if interaction.guild and interaction.guild.id != self.guild_id:
-            await interaction.response.send_message("This control panel is not for this server.", ephemeral=True)
+        if interaction.guild_id is None:
+            await interaction.response.send_message("This control panel only works in a server.", ephemeral=True)
             return False
         return True
 
-    async def on_timeout(self):
-        for child in self.children:
-            child.disabled = True
-
-    @discord.ui.button(label="Rewind", emoji="⏪", style=discord.ButtonStyle.gray, row=0)
+    @discord.ui.button(label="Rewind", custom_id="vibecast:panel:rewind", emoji="⏪", style=discord.ButtonStyle.gray, row=0)
     async def rewind_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        await interaction.response.send_modal(SeekModal(self.cog, self.guild_id, mode="rewind"))
+        await interaction.response.send_modal(SeekModal(self.cog, interaction.guild_id, mode="rewind"))
 
-    @discord.ui.button(label="Play/Pause", emoji="⏯️", style=discord.ButtonStyle.blurple, row=0)
+    @discord.ui.button(label="Play/Pause", custom_id="vibecast:panel:pause", emoji="⏯️", style=discord.ButtonStyle.blurple, row=0)
     async def pause_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        vc = interaction.guild.voice_client if interaction.guild else None
-        if not vc:
-            await interaction.response.send_message("Not connected.", ephemeral=True)
+        guild_id = interaction.guild_id
+        ok, vc = await self.cog._guard(interaction, need_vc=True)
+        if not ok:
             return
-        if vc.is_playing():
-            vc.pause()
-            self.cog.pause_marks[self.guild_id] = time.monotonic()
-            await interaction.response.send_message("Paused.", ephemeral=True)
-        elif vc.is_paused():
+
+        async def action():
+            state = self.cog.playback[guild_id]
             now = time.monotonic()
-            paused_at = self.cog.pause_marks.pop(self.guild_id, None)
-            if paused_at:
-                self.cog.pause_offsets[self.guild_id] = self.cog.pause_offsets.get(self.guild_id, 0.0) + (
-                    now - paused_at
-                )
-            vc.resume()
-            await interaction.response.send_message("Resumed.", ephemeral=True)
-        else:
-            await interaction.response.send_message("Nothing to pause/resume.", ephemeral=True)
-            return
-        await self.cog._update_panels(self.guild_id)
+            if state.status == "playing":
+                vc.pause()
+                state.mark_paused(now)
+            elif state.status == "paused":
+                vc.resume()
+                state.mark_resumed(now)
+            else:
+                await interaction.followup.send("Nothing to pause/resume.", ephemeral=True)
+                return
+            self.cog._schedule_panel_update(guild_id)
 
-    @discord.ui.button(label="Fast Forward", emoji="⏩", style=discord.ButtonStyle.gray, row=0)
+        await self.cog._submit_control(guild_id, CONTROL_PRIORITY, action)
+
+    @discord.ui.button(label="Fast Forward", custom_id="vibecast:panel:forward", emoji="⏩", style=discord.ButtonStyle.gray, row=0)
     async def ff_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        await interaction.response.send_modal(SeekModal(self.cog, self.guild_id, mode="forward"))
+        await interaction.response.send_modal(SeekModal(self.cog, interaction.guild_id, mode="forward"))
 
-    @discord.ui.button(label="Stop", emoji="⏹️", style=discord.ButtonStyle.danger, row=1)
+    @discord.ui.button(label="Stop", custom_id="vibecast:panel:stop", emoji="⏹️", style=discord.ButtonStyle.danger, row=1)
     async def stop_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        if not self.cog._has_permission(interaction.user):  # type: ignore
-            await interaction.response.send_message("You don't have permission.", ephemeral=True)
+        guild_id = interaction.guild_id
+        ok, vc = await self.cog._guard(interaction, need_perm=True, need_vc=True)
+        if not ok:
             return
-        vc = interaction.guild.voice_client if interaction.guild else None
-        if vc:
-            await self.cog.queue_manager.clear(interaction.guild.id)
-            self.cog.skip_after[self.guild_id] = True
+
+        async def action():
+            state = self.cog.playback[guild_id]
+            state.skip_after = True
             vc.stop()
-            self.cog.current[interaction.guild.id] = None
-            self.cog._reset_progress(interaction.guild.id)
-            await interaction.response.send_message("Stopped and cleared.", ephemeral=True)
-            await self.cog._delete_panels(self.guild_id)
-        else:
-            await interaction.response.send_message("Not connected.", ephemeral=True)
+            self.cog._clear_current(guild_id)
+            await asyncio.gather(
+                self.cog.queue_manager.clear(guild_id),
+                self.cog._delete_panels(guild_id),
+                interaction.followup.send("Stopped and cleared.", ephemeral=True),
+            )
+
+        await self.cog._submit_control(guild_id, CONTROL_PRIORITY, action)
 
-    @discord.ui.button(label="Volume", emoji="🔊", style=discord.ButtonStyle.gray, row=1)
+    @discord.ui.button(label="Volume", custom_id="vibecast:panel:volume", emoji="🔊", style=discord.ButtonStyle.gray, row=1)
     async def volume_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        await interaction.response.send_modal(VolumeModal(self.cog, self.guild_id))
+        await interaction.response.send_modal(VolumeModal(self.cog, interaction.guild_id))
 
-    @discord.ui.button(label="Skip Song", emoji="⏭️", style=discord.ButtonStyle.gray, row=1)
+    @discord.ui.button(label="Skip Song", custom_id="vibecast:panel:skip", emoji="⏭️", style=discord.ButtonStyle.gray, row=1)
     async def skip_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        vc = interaction.guild.voice_client if interaction.guild else None
-        if not vc or not vc.is_connected():
-            await interaction.response.send_message("Not connected.", ephemeral=True)
+        guild_id = interaction.guild_id
+        ok, vc = await self.cog._guard(interaction, need_vc=True)
+        if not ok:
             return
-        vc.stop()
-        await interaction.response.send_message("Skipped.", ephemeral=True)
-        await self.cog._update_panels(self.guild_id)
 
-    @discord.ui.button(label="Clear Queue", emoji="🧹", style=discord.ButtonStyle.gray, row=1)
+        async def action():
+            vc.stop()
+            self.cog._schedule_panel_update(guild_id)
+
+        await self.cog._submit_control(guild_id, CONTROL_PRIORITY, action)
+
+    @discord.ui.button(label="Clear Queue", custom_id="vibecast:panel:clear", emoji="🧹", style=discord.ButtonStyle.gray, row=1)
     async def clear_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        if not self.cog._has_permission(interaction.user):  # type: ignore
-            await interaction.response.send_message("You don't have permission.", ephemeral=True)
+        guild_id = interaction.guild_id
+        ok, _vc = await self.cog._guard(interaction, need_perm=True)
+        if not ok:
+            return
+        if await self.cog.queue_manager.is_empty(guild_id):
+            await interaction.followup.send("Queue already empty.", ephemeral=True)
             return
-        await self.cog.queue_manager.clear(interaction.guild.id)
-        await interaction.response.send_message("Queue cleared.", ephemeral=True)
-        await self.cog._update_panels(self.guild_id)
 
-    @discord.ui.button(label="Search", emoji="🔍", style=discord.ButtonStyle.blurple, row=2)
+        async def action():
+            await self.cog.queue_manager.clear(guild_id)
+            self.cog._schedule_panel_update(guild_id)
+
+        await self.cog._submit_control(guild_id, BACKGROUND_PRIORITY, action)
+
+    @discord.ui.button(label="Search", custom_id="vibecast:panel:search", emoji="🔍", style=discord.ButtonStyle.blurple, row=2)
     async def search_btn(self, interaction: discord.Interaction, _: discord.ui.Button):
-        await interaction.response.send_modal(SearchModal(self.cog, self.guild_id))
+        await interaction.response.send_modal(SearchModal(self.cog, interaction.guild_id))
 
 
 async def setup(bot: commands.Bot):
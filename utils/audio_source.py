@@ -1,18 +1,34 @@
+import asyncio
+import dataclasses
+import functools
+import itertools
 import os
 import re
 import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import Optional, List, Dict
 
 import yt_dlp
 
 try:
+    import requests
     import spotipy
+    from requests.adapters import HTTPAdapter
+    from spotipy.exceptions import SpotifyException
     from spotipy.oauth2 import SpotifyClientCredentials
+    from urllib3.util.retry import Retry
 except ImportError:
     spotipy = None
     SpotifyClientCredentials = None
+    SpotifyException = None
 
 from .queue_manager import Track
+from .rate_limiter import TokenBucket
+from .ttl_cache import TTLCache
 
 
 BASE_YDL_OPTS = {
@@ -22,6 +38,70 @@ BASE_YDL_OPTS = {
     "default_search": "ytsearch",
     "source_address": "0.0.0.0",
 }
+# Flat playlist enumeration; entries stay lazy (process=False) and are bounded with islice, not playlistend.
+PLAYLIST_YDL_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "extract_flat": "in_playlist",
+    "skip_download": True,
+    "youtube_include_dash_manifest": False,
+}
+# Signed stream URLs expire after a few hours; stay well inside that window.
+RESOLVE_CACHE_TTL = 1800
+RESOLVE_CACHE_SIZE = 1024
+RESOLVER_WORKERS = 8
+PLAYLIST_CACHE_TTL = 600
+PLAYLIST_CACHE_SIZE = 64
+# If the current extraction attempt hasn't answered by then, start the next fallback alongside it.
+# Well above a normal extraction, so hedging only kicks in for attempts that are actually stuck.
+HEDGE_DELAY = 8.0
+# Per-resolve cap on concurrently running attempts; with the attempt pool sized at 2x the resolver
+# workers this keeps every attempt running instead of queueing behind abandoned losers.
+MAX_PARALLEL_ATTEMPTS = 2
+# Circuit breaker for yt-dlp attempts: a client under CLIENT_MIN_SUCCESS over its recent window sits out a cool-down.
+CLIENT_STATS_WINDOW = 32
+CLIENT_MIN_SAMPLES = 16
+CLIENT_MIN_SUCCESS = 0.1
+CLIENT_COOLDOWN = 60.0
+SPOTIFY_RATE_LIMIT_ATTEMPTS = 5
+SPOTIFY_PAGE_SIZE = 100
+SPOTIFY_PLAYLIST_FIELDS = "items(track(name,artists(name),duration_ms,external_urls)),next"
+SPOTIFY_MAX_BACKOFF = 30.0
+# Client-side ceilings (requests/second, burst) kept under the providers' own limits.
+SPOTIFY_RATE = (20.0, 20)
+YOUTUBE_RATE = (5.0, 10)
+# Fallback order for yt-dlp extraction: (name, option overrides).
+YTDLP_ATTEMPTS = (
+    ("android", {"extractor_args": {"youtube": {"player_client": ["android"]}}}),
+    ("tvembedded", {"extractor_args": {"youtube": {"player_client": ["tvembedded"]}}}),
+    ("default", None),
+    ("any_format", {"format": "bestaudio/best"}),
+)
+
+
+URL_PREFIXES = ("http://", "https://")
+SPOTIFY_TRACK_RE = re.compile(r"/track/([A-Za-z0-9]+)")
+SPOTIFY_PLAYLIST_RE = re.compile(r"/playlist/([A-Za-z0-9]+)")
+YOUTUBE_ID_RE = re.compile(r"(?:youtube\.com/watch\?v=|youtu\.be/)([\w-]+)")
+
+
+@functools.lru_cache(maxsize=2048)
+def youtube_id_for(url: str) -> Optional[str]:
+    match = YOUTUBE_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def youtube_thumbnail_for(video_id: Optional[str]) -> Optional[str]:
+    if not video_id or len(video_id) > 20:
+        return None
+    return f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+
+
+def ffmpeg_headers_option(headers: Optional[dict]) -> Optional[str]:
+    if not headers:
+        return None
+    header_blob = "\r\n".join(f"{k}: {v}" for k, v in headers.items())
+    return f'-headers "{header_blob}\r\n"'
 
 
 class AudioSource:
@@ -33,10 +113,53 @@ class AudioSource:
         self.spotify_client_secret = (
             os.getenv("SPOTIFY_CLIENT_SECRET") or config.get("spotify_client_secret") or ""
         )
+        self.resolver_workers = int(config.get("ytdl_workers", RESOLVER_WORKERS))
+        self.hedge_delay = float(config.get("ytdl_hedge_delay", HEDGE_DELAY))
+        self._http_session = None
+        self._spotify_bucket = TokenBucket(*SPOTIFY_RATE)
+        self._youtube_bucket = TokenBucket(*YOUTUBE_RATE)
         self.spotify_client = self._build_spotify_client()
         self.youtube_cookies = os.getenv("YOUTUBE_COOKIES") or config.get("youtube_cookies_file") or ""
         self.youtube_po_token = os.getenv("YOUTUBE_PO_TOKEN") or config.get("youtube_po_token") or ""
+        youtube_args = {"player_client": ["web"]}
+        if self.youtube_po_token:
+            youtube_args["po_token"] = [self.youtube_po_token]
+        self._base_extractor_args = {"youtube": youtube_args}
         self.logger = logging.getLogger("AudioSource")
+        self._cookiefile: Optional[str] = None
+        if self.youtube_cookies:
+            if os.path.exists(self.youtube_cookies):
+                self._cookiefile = self.youtube_cookies
+            else:
+                self.logger.warning("YouTube cookies file not found at %s", self.youtube_cookies)
+        self._resolved = TTLCache(maxsize=RESOLVE_CACHE_SIZE, ttl=RESOLVE_CACHE_TTL)
+        self._resolved_lock = threading.Lock()
+        self._inflight: Dict[tuple, Future] = {}
+        self._playlists = TTLCache(maxsize=PLAYLIST_CACHE_SIZE, ttl=PLAYLIST_CACHE_TTL)
+        self._pool = ThreadPoolExecutor(max_workers=self.resolver_workers, thread_name_prefix="resolver")
+        # Separate pool so resolver threads can wait on their attempts without starving them.
+        self._attempt_pool = ThreadPoolExecutor(max_workers=self.resolver_workers * 2, thread_name_prefix="ytdl")
+        self._ydl_local = threading.local()
+        # Every thread-local instance, so close() can reach them from whichever thread shuts down.
+        self._ydl_instances: List[yt_dlp.YoutubeDL] = []
+        self._ydl_instances_lock = threading.Lock()
+        self._client_stats: defaultdict[str, deque] = defaultdict(lambda: deque(maxlen=CLIENT_STATS_WINDOW))
+        self._client_blocked_until: Dict[str, float] = {}
+        self._client_lock = threading.Lock()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._attempt_pool.shutdown(wait=False, cancel_futures=True)
+        if self._http_session is not None:
+            self._http_session.close()
+        with self._ydl_instances_lock:
+            instances, self._ydl_instances = self._ydl_instances, []
+        for ydl in instances:
+            # YoutubeDL.close() writes back a refreshed cookiefile, as leaving its context manager would.
+            try:
+                ydl.close()
+            except Exception as exc:
+                self.logger.warning("Failed to close YoutubeDL: %s", exc)
 
     def _build_spotify_client(self):
         if not self.spotify_enabled:
@@ -45,35 +168,64 @@ class AudioSource:
             return None
         if spotipy is None:
             return None
+        # One keep-alive session sized for the resolver pool, shared by token refreshes and API calls.
+        # spotipy only installs its own retry adapter when it creates the session, so mount ours here.
+        session = requests.Session()
+        # Transient 5xx only: 429s must reach _spotify_call with their Retry-After header intact, and
+        # raise_on_status=False hands back the last response instead of a header-less RetryError.
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.resolver_workers * 2, max_retries=retry)
+        session.mount("https://", adapter)
+        self._http_session = session
         creds = SpotifyClientCredentials(
             client_id=self.spotify_client_id,
             client_secret=self.spotify_client_secret,
+            requests_session=session,
         )
-        return spotipy.Spotify(auth_manager=creds, requests_timeout=10, retries=3)
+        return spotipy.Spotify(auth_manager=creds, requests_session=session, requests_timeout=10)
+
+    def _spotify_call(self, fn, *args, **kwargs):
+        # Runs on resolver threads, so a blocking sleep only holds this worker, never the event loop.
+        for attempt in range(SPOTIFY_RATE_LIMIT_ATTEMPTS):
+            self._spotify_bucket.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except SpotifyException as exc:
+                if exc.http_status == 429:
+                    self._spotify_bucket.penalize()
+                if exc.http_status != 429 or attempt == SPOTIFY_RATE_LIMIT_ATTEMPTS - 1:
+                    raise
+                # The session adapter never retries 429s, so spotipy raises with the response's headers here.
+                retry_after = (exc.headers or {}).get("Retry-After")
+                try:
+                    delay = float(retry_after) if retry_after else 2.0 ** attempt
+                except ValueError:
+                    delay = 2.0 ** attempt
+                delay = min(delay, SPOTIFY_MAX_BACKOFF) + random.uniform(0, 0.5)
+                self.logger.warning("Spotify rate limited; retrying in %.1fs", delay)
+                time.sleep(delay)
 
     @staticmethod
     def _is_url(query: str) -> bool:
-        return query.startswith("http://") or query.startswith("https://")
+        return query.startswith(URL_PREFIXES)
 
     @staticmethod
     def _is_spotify_url(url: str) -> bool:
         return "open.spotify.com" in url and "/track/" in url
 
-    @staticmethod
-    def _is_soundcloud_url(url: str) -> bool:
-        return "soundcloud.com" in url
-
     def _yt_opts(self, overrides: Optional[dict] = None) -> dict:
         opts = dict(BASE_YDL_OPTS)
-        if self.youtube_cookies:
-            if os.path.exists(self.youtube_cookies):
-                opts["cookiefile"] = self.youtube_cookies
-            else:
-                self.logger.warning("YouTube cookies file not found at %s", self.youtube_cookies)
-        extractor_args = {"youtube": {"player_client": ["web"]}}
-        if self.youtube_po_token:
-            extractor_args["youtube"]["po_token"] = [self.youtube_po_token]
-        opts["extractor_args"] = extractor_args
+        if self._cookiefile:
+            opts["cookiefile"] = self._cookiefile
+        # Overrides merge into a fresh dict below, so the shared base is never mutated.
+        opts["extractor_args"] = self._base_extractor_args
         if overrides:
             for k, v in overrides.items():
                 if isinstance(v, dict) and isinstance(opts.get(k), dict):
@@ -84,9 +236,26 @@ class AudioSource:
                     opts[k] = v
         return opts
 
-    def _try_extract(self, query: str, opts: dict, requester: str) -> Track:
-        with yt_dlp.YoutubeDL(opts) as ydl:
+    def _ydl(self, name: str, overrides: Optional[dict], opts: Optional[dict] = None) -> yt_dlp.YoutubeDL:
+        # YoutubeDL setup is costly and instances aren't thread-safe, so keep one per attempt per worker thread.
+        instances = getattr(self._ydl_local, "instances", None)
+        if instances is None:
+            instances = self._ydl_local.instances = {}
+        ydl = instances.get(name)
+        if ydl is None:
+            ydl = instances[name] = yt_dlp.YoutubeDL(opts if opts is not None else self._yt_opts(overrides))
+            with self._ydl_instances_lock:
+                self._ydl_instances.append(ydl)
+        return ydl
+
+    def _try_extract(self, query: str, ydl: yt_dlp.YoutubeDL, requester: str) -> Track:
+        self._youtube_bucket.acquire()
+        try:
             info = ydl.extract_info(query, download=False)
+        except yt_dlp.utils.DownloadError as exc:
+            if "429" in str(exc):
+                self._youtube_bucket.penalize()
+            raise
         if info is None:
             raise ValueError("No results found.")
         if "entries" in info:
@@ -106,49 +275,189 @@ class AudioSource:
             source=self._guess_source(url),
             stream_url=stream_url,
             headers=headers,
+            # Built once here; every playback start and seek reuses it.
+            header_option=ffmpeg_headers_option(headers),
         )
+        self._tag_youtube_id(track)
         return track
 
+    @staticmethod
+    def _tag_youtube_id(track: Track):
+        # Parse the video id once at resolve time so panel refreshes only read attributes.
+        track.youtube_id = youtube_id_for(track.url)
+        track.thumbnail_url = youtube_thumbnail_for(track.youtube_id)
+
+    async def resolve_async(self, query: str, requester: str) -> Track:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.resolve, query, requester)
+
     def resolve(self, query: str, requester: str) -> Track:
         query = query.strip()
+        key = self._cache_key(query)
+        with self._resolved_lock:
+            cached = self._resolved.get(key)
+            if cached is None:
+                # Single-flight: concurrent misses for the same key wait on the first caller's extraction.
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    self._inflight[key] = Future()
+        if cached is not None:
+            return dataclasses.replace(cached, requester=requester)
+        if inflight is not None:
+            return dataclasses.replace(inflight.result(), requester=requester)
+        try:
+            track = self._resolve_uncached(query, requester)
+        except BaseException as exc:
+            with self._resolved_lock:
+                fut = self._inflight.pop(key)
+            fut.set_exception(exc)
+            raise
+        # Store a private copy; callers are free to tweak the Track they get back.
+        stored = dataclasses.replace(track)
+        with self._resolved_lock:
+            self._resolved.set(key, stored)
+            fut = self._inflight.pop(key)
+        fut.set_result(stored)
+        return track
+
+    def _cache_key(self, query: str) -> tuple:
+        # Search text is case/space-insensitive; URLs are not (video ids are case-sensitive).
+        if not self._is_url(query):
+            return ("q", " ".join(query.lower().split()))
+        if self._is_spotify_url(query):
+            match = SPOTIFY_TRACK_RE.search(query)
+            if match:
+                return ("sp", match.group(1))
+        return ("url", query)
+
+    def unresolved_track(self, entry: dict, requester: str) -> Optional[Track]:
+        # Build a Track from stored/flat metadata without touching yt-dlp; see materialize().
+        url = entry.get("url")
+        if not url or not self._is_url(url):
+            return None
+        track = Track(
+            title=entry.get("title") or "Unknown title",
+            url=url,
+            requester=requester,
+            duration=entry.get("duration"),
+            source=entry.get("source") or self._guess_source(url),
+            stream_url=None,
+        )
+        self._tag_youtube_id(track)
+        return track
+
+    def materialize(self, track: Track) -> Track:
+        if track.stream_url:
+            return track
+        resolved = self.resolve(track.url, track.requester)
+        track.stream_url = resolved.stream_url
+        track.headers = resolved.headers
+        track.header_option = resolved.header_option
+        if track.duration is None:
+            track.duration = resolved.duration
+        return track
+
+    async def materialize_async(self, track: Track) -> Track:
+        if track.stream_url:
+            return track
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.materialize, track)
+
+    def _resolve_uncached(self, query: str, requester: str) -> Track:
         if self._is_url(query):
             if self._is_spotify_url(query):
                 track_from_spotify = self._from_spotify(query, requester)
                 if track_from_spotify is None:
                     raise ValueError("Unable to resolve Spotify track. Check credentials or link.")
                 return track_from_spotify
-            source = "SoundCloud" if self._is_soundcloud_url(query) else "YouTube"
-            return self._from_ytdlp(query, requester, source_override=source)
+            source = self._guess_source(query)
+            return self._from_ytdlp(query, requester, source_override="SoundCloud" if source == "SoundCloud" else "YouTube")
         return self._from_ytdlp(f"ytsearch1:{query}", requester, source_override="YouTube")
 
+    def _attempt_order(self) -> list:
+        # Open circuits are skipped; if every client is open, try them all anyway. Clients with at least
+        # CLIENT_MIN_SAMPLES results are reordered best-first among their own slots; the others keep their
+        # YTDLP_ATTEMPTS position, so a lack of data never outranks measured evidence or vice versa.
+        now = time.monotonic()
+        with self._client_lock:
+            available = [a for a in YTDLP_ATTEMPTS if self._client_blocked_until.get(a[0], 0.0) <= now]
+            rates = {
+                name: sum(stats) / len(stats)
+                for name, stats in self._client_stats.items()
+                if len(stats) >= CLIENT_MIN_SAMPLES
+            }
+        order = list(available or YTDLP_ATTEMPTS)
+        slots = [i for i, a in enumerate(order) if a[0] in rates]
+        ranked = sorted((order[i] for i in slots), key=lambda a: -rates[a[0]])
+        for i, attempt in zip(slots, ranked):
+            order[i] = attempt
+        return order
+
+    def _record_attempt(self, name: str, ok: bool):
+        with self._client_lock:
+            stats = self._client_stats[name]
+            stats.append(ok)
+            if len(stats) >= CLIENT_MIN_SAMPLES and sum(stats) / len(stats) < CLIENT_MIN_SUCCESS:
+                self._client_blocked_until[name] = time.monotonic() + CLIENT_COOLDOWN
+                # Start fresh after the cool-down so a recovered client isn't re-tripped by stale failures.
+                stats.clear()
+                self.logger.warning("yt-dlp client %s failing; skipping it for %.0fs", name, CLIENT_COOLDOWN)
+
+    def _run_attempt(self, name: str, overrides: Optional[dict], query: str, requester: str) -> Track:
+        try:
+            track = self._try_extract(query, self._ydl(name, overrides), requester)
+        except Exception:
+            self._record_attempt(name, False)
+            raise
+        self._record_attempt(name, True)
+        return track
+
     def _from_ytdlp(self, query: str, requester: str, source_override: Optional[str] = None) -> Track:
         errors = []
-        attempts = [
-            self._yt_opts({"extractor_args": {"youtube": {"player_client": ["android"]}}}),
-            self._yt_opts({"extractor_args": {"youtube": {"player_client": ["tvembedded"]}}}),
-            self._yt_opts(),
-            self._yt_opts({"format": "bestaudio/best"}),
-        ]
-        for opts in attempts:
-            try:
-                track = self._try_extract(query, opts, requester)
+        attempts = iter(self._attempt_order())
+        pending = set()
+
+        def launch() -> bool:
+            attempt = next(attempts, None)
+            if attempt is None:
+                return False
+            name, overrides = attempt
+            pending.add(self._attempt_pool.submit(self._run_attempt, name, overrides, query, requester))
+            return True
+
+        # Hedged fallbacks: a failure starts the next player client right away, a stuck attempt only after
+        # hedge_delay and while under MAX_PARALLEL_ATTEMPTS; first success wins.
+        launch()
+        while pending:
+            timeout = self.hedge_delay if len(pending) < MAX_PARALLEL_ATTEMPTS else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                launch()
+                continue
+            for fut in done:
+                pending.discard(fut)
+                try:
+                    track = fut.result()
+                except Exception as exc:
+                    errors.append(str(exc))
+                    launch()
+                    continue
+                for other in pending:
+                    other.cancel()
                 if source_override:
                     track.source = source_override
                 return track
-            except Exception as exc:
-                errors.append(str(exc))
-                continue
         raise ValueError("Unable to fetch stream URL. Errors: " + " | ".join(errors))
 
     def _from_spotify(self, url: str, requester: str) -> Optional[Track]:
         if not self.spotify_client:
             return None
         try:
-            match = re.search(r"/track/([A-Za-z0-9]+)", url)
+            match = SPOTIFY_TRACK_RE.search(url)
             if not match:
                 return None
             track_id = match.group(1)
-            meta = self.spotify_client.track(track_id)
+            meta = self._spotify_call(self.spotify_client.track, track_id)
         except Exception:
             return None
         name = meta.get("name", "Unknown track")
@@ -160,40 +469,77 @@ class AudioSource:
         # Preserve Spotify link as the track URL for context
         track.url = url
         track.duration = duration
+        self._tag_youtube_id(track)
         return track
 
+    async def fetch_playlist_entries_async(self, url: str, limit: int = 50) -> List[Dict[str, str]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.fetch_playlist_entries, url, limit)
+
     def fetch_playlist_entries(self, url: str, limit: int = 50) -> List[Dict[str, str]]:
+        key = (url.strip(), limit)
+        with self._resolved_lock:
+            cached = self._playlists.get(key)
+        if cached is not None:
+            return list(cached)
+        entries = self._fetch_playlist_entries_uncached(url, limit)
+        if entries:
+            with self._resolved_lock:
+                self._playlists.set(key, list(entries))
+        return entries
+
+    def _fetch_playlist_entries_uncached(self, url: str, limit: int) -> List[Dict[str, str]]:
         entries: List[Dict[str, str]] = []
-        if self._is_spotify_url(url) and self.spotify_client and "/playlist/" in url:
+        if "open.spotify.com" in url and "/playlist/" in url and self.spotify_client:
             try:
-                playlist_id = re.search(r"/playlist/([A-Za-z0-9]+)", url)
-                if playlist_id:
-                    resp = self.spotify_client.playlist_tracks(playlist_id.group(1), limit=limit)
-                    for item in resp.get("items", []):
+                playlist_id = SPOTIFY_PLAYLIST_RE.search(url)
+                offset = 0
+                while playlist_id and offset < limit:
+                    # Field-projected pages of up to 100 items; the page already carries everything we store.
+                    page = self._spotify_call(
+                        self.spotify_client.playlist_items,
+                        playlist_id.group(1),
+                        fields=SPOTIFY_PLAYLIST_FIELDS,
+                        limit=min(SPOTIFY_PAGE_SIZE, limit - offset),
+                        offset=offset,
+                        additional_types=("track",),
+                    )
+                    items = page.get("items") or []
+                    for item in items:
                         track = item.get("track") or {}
                         name = track.get("name")
                         artists = ", ".join(a["name"] for a in track.get("artists", []))
+                        duration_ms = track.get("duration_ms")
                         if name:
-                            entries.append({"title": name, "query": f"{name} {artists}".strip(), "url": track.get("external_urls", {}).get("spotify", url)})
+                            entries.append({
+                                "title": name,
+                                "query": f"{name} {artists}".strip(),
+                                "url": track.get("external_urls", {}).get("spotify"),
+                                "duration": int(duration_ms / 1000) if duration_ms else None,
+                            })
+                    offset += len(items)
+                    if not items or not page.get("next"):
+                        break
             except Exception:
                 pass
             return entries
 
         # YouTube playlist or generic; use yt_dlp flat extraction
-        ydl_opts = {
-            "quiet": True,
-            "extract_flat": True,
-            "skip_download": True,
-            "playlistend": limit,
-        }
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-            if info and "entries" in info:
-                for item in info["entries"][:limit]:
+            self._youtube_bucket.acquire()
+            ydl = self._ydl("playlist", None, opts=PLAYLIST_YDL_OPTS)
+            # process=False keeps "entries" lazy, so only the first `limit` items are ever fetched.
+            info = ydl.extract_info(url, download=False, process=False)
+            if info and info.get("_type") == "url" and info.get("url"):
+                # e.g. watch?v=...&list=... hands off to the playlist extractor; follow it once.
+                info = ydl.extract_info(info["url"], download=False, process=False)
+            if info and info.get("entries") is not None:
+                for item in itertools.islice(info["entries"], limit):
                     title = item.get("title") or "Unknown"
-                    link = item.get("url") or item.get("webpage_url") or url
-                    entries.append({"title": title, "query": title, "url": link})
+                    link = item.get("url") or item.get("webpage_url")
+                    if not link and item.get("id") and item.get("ie_key") == "Youtube":
+                        link = f"https://www.youtube.com/watch?v={item['id']}"
+                    entries.append({"title": title, "query": title, "url": link, "duration": item.get("duration")})
         except Exception:
             # fallback: treat as single item
             pass
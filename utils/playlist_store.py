@@ -1,28 +1,141 @@
+import asyncio
 import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LEGACY_JSON_PATH = Path("data/playlists.json")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS tracks("
+    "guild_id INTEGER NOT NULL, playlist TEXT NOT NULL, pos INTEGER NOT NULL, payload BLOB NOT NULL, "
+    "PRIMARY KEY(guild_id, playlist, pos))"
+)
+META_SCHEMA = "CREATE TABLE IF NOT EXISTS meta(key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+LEGACY_IMPORTED_KEY = "legacy_json_imported"
+
 
 class PlaylistStore:
-    def __init__(self, path: Path = Path("data/playlists.json")):
+    def __init__(self, path: Path = Path("data/playlists.db"), legacy_path: Optional[Path] = LEGACY_JSON_PATH):
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger("PlaylistStore")
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        self._conn.execute(META_SCHEMA)
+        self._conn.commit()
+        # Single writer thread keeps statements ordered and off the event loop.
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="playlist-db")
+        self._pending: set[asyncio.Future] = set()
+        # Reads stay synchronous for callers, so mirror the table in memory.
         self._data: Dict[str, Dict[str, List[dict]]] = {}
         self._load()
+        if legacy_path is not None and not self._legacy_imported():
+            if self._data or not legacy_path.exists():
+                # Nothing to migrate (or the DB predates the marker); record it so deletions stick.
+                self._mark_legacy_imported()
+            else:
+                self._import_legacy(legacy_path)
 
     def _load(self):
-        if self.path.exists():
-            try:
-                with self.path.open("r", encoding="utf-8") as fp:
-                    self._data = json.load(fp)
-            except Exception:
-                self._data = {}
-        else:
-            self._data = {}
-
-    def _save(self):
-        with self.path.open("w", encoding="utf-8") as fp:
-            json.dump(self._data, fp, indent=2)
+        rows = self._conn.execute("SELECT guild_id, playlist, payload FROM tracks ORDER BY guild_id, playlist, pos")
+        for guild_id, playlist, payload in rows:
+            self._data.setdefault(str(guild_id), {}).setdefault(playlist, []).append(self._decode(payload))
+
+    def _legacy_imported(self) -> bool:
+        row = self._conn.execute("SELECT 1 FROM meta WHERE key = ?", (LEGACY_IMPORTED_KEY,)).fetchone()
+        return row is not None
+
+    def _mark_legacy_imported(self):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, '1')", (LEGACY_IMPORTED_KEY,))
+
+    def _import_legacy(self, legacy_path: Path):
+        try:
+            legacy = self._decode(legacy_path.read_bytes())
+        except Exception as exc:
+            self.logger.warning("Failed to read legacy playlists from %s: %s", legacy_path, exc)
+            return
+        rows = [
+            (int(guild_key), name, pos, self._encode(track))
+            for guild_key, playlists in legacy.items()
+            for name, tracks in playlists.items()
+            for pos, track in enumerate(tracks)
+        ]
+        # Rows and the migration marker commit together, so the import runs exactly once.
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks(guild_id, playlist, pos, payload) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, '1')", (LEGACY_IMPORTED_KEY,))
+        for guild_key, playlists in legacy.items():
+            for name, tracks in playlists.items():
+                if tracks:
+                    self._data.setdefault(guild_key, {})[name] = list(tracks)
+        self.logger.info("Imported legacy playlists from %s", legacy_path)
+
+    @staticmethod
+    def _encode(track: dict) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(track)
+        return json.dumps(track, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _decode(payload: bytes):
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+    def _insert_rows(self, guild_id: int, name: str, start: int, tracks: List[dict]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tracks(guild_id, playlist, pos, payload) VALUES (?, ?, ?, ?)",
+                [(guild_id, name, start + i, self._encode(t)) for i, t in enumerate(tracks)],
+            )
+
+    def _replace_rows(self, guild_id: int, name: str, tracks: List[dict]):
+        with self._conn:
+            self._conn.execute("DELETE FROM tracks WHERE guild_id = ? AND playlist = ?", (guild_id, name))
+            self._conn.executemany(
+                "INSERT INTO tracks(guild_id, playlist, pos, payload) VALUES (?, ?, ?, ?)",
+                [(guild_id, name, i, self._encode(t)) for i, t in enumerate(tracks)],
+            )
+
+    def _delete_rows(self, guild_id: int, name: str):
+        with self._conn:
+            self._conn.execute("DELETE FROM tracks WHERE guild_id = ? AND playlist = ?", (guild_id, name))
+
+    def _submit(self, fn, *args):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._writer.submit(fn, *args).result()
+            return
+        fut = loop.run_in_executor(self._writer, fn, *args)
+        self._pending.add(fut)
+        fut.add_done_callback(self._write_done)
+
+    def _write_done(self, fut: asyncio.Future):
+        self._pending.discard(fut)
+        if not fut.cancelled() and fut.exception() is not None:
+            self.logger.error("Playlist write failed: %s", fut.exception())
+
+    async def flush(self):
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._conn.close()
 
     def list_playlists(self, guild_id: int) -> List[str]:
         guild_key = str(guild_id)
@@ -31,19 +144,25 @@ class PlaylistStore:
     def save_playlist(self, guild_id: int, name: str, tracks: List[dict]):
         guild_key = str(guild_id)
         self._data.setdefault(guild_key, {})[name] = tracks
-        self._save()
+        self._submit(self._replace_rows, guild_id, name, list(tracks))
 
     def append_track(self, guild_id: int, name: str, track: dict):
+        self.append_tracks(guild_id, name, [track])
+
+    def append_tracks(self, guild_id: int, name: str, tracks: List[dict]):
+        if not tracks:
+            return
         guild_key = str(guild_id)
         playlist = self._data.setdefault(guild_key, {}).setdefault(name, [])
-        playlist.append(track)
-        self._save()
+        start = len(playlist)
+        playlist.extend(tracks)
+        self._submit(self._insert_rows, guild_id, name, start, list(tracks))
 
     def delete_playlist(self, guild_id: int, name: str) -> bool:
         guild_key = str(guild_id)
         if guild_key in self._data and name in self._data[guild_key]:
             del self._data[guild_key][name]
-            self._save()
+            self._submit(self._delete_rows, guild_id, name)
             return True
         return False
 
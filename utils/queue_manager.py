@@ -1,61 +1,88 @@
 import asyncio
+from collections import defaultdict, deque
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Deque, Dict, Iterable, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Track:
     title: str
     url: str
     requester: str
     duration: Optional[int]
     source: str
-    stream_url: str
+    # None until the stream is resolved; lazily loaded tracks only fetch it right before playback.
+    stream_url: Optional[str]
     headers: Optional[dict] = None
+    youtube_id: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    header_option: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {"title": self.title, "url": self.url, "duration": self.duration, "source": self.source}
 
 
 class QueueManager:
     def __init__(self, max_length: int = 50):
-        self._queues: Dict[int, List[Track]] = {}
-        self._locks: Dict[int, asyncio.Lock] = {}
+        self._queues: Dict[int, Deque[Track]] = {}
+        self._locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
         self.max_length = max_length
 
     def _get_lock(self, guild_id: int) -> asyncio.Lock:
-        if guild_id not in self._locks:
-            self._locks[guild_id] = asyncio.Lock()
         return self._locks[guild_id]
 
     async def add_track(self, guild_id: int, track: Track) -> bool:
         async with self._get_lock(guild_id):
-            queue = self._queues.setdefault(guild_id, [])
+            queue = self._queues.get(guild_id)
+            if queue is None:
+                queue = self._queues[guild_id] = deque()
             if len(queue) >= self.max_length:
                 return False
             queue.append(track)
             return True
 
+    async def add_tracks(self, guild_id: int, tracks: Iterable[Track]) -> int:
+        # One lock acquisition for a whole batch; stops at max_length and returns how many fit.
+        async with self._get_lock(guild_id):
+            queue = self._queues.get(guild_id)
+            if queue is None:
+                queue = self._queues[guild_id] = deque()
+            room = self.max_length - len(queue)
+            if room <= 0:
+                return 0
+            before = len(queue)
+            queue.extend(islice((t for t in tracks if t is not None), room))
+            return len(queue) - before
+
     async def pop_next(self, guild_id: int) -> Optional[Track]:
         async with self._get_lock(guild_id):
-            queue = self._queues.get(guild_id, [])
+            queue = self._queues.get(guild_id)
             if queue:
-                return queue.pop(0)
+                return queue.popleft()
             return None
 
+    # Reads are a single dict/deque operation with no await, so they can't interleave with a locked
+    # mutation; only add_track/pop_next/clear take the per-guild lock.
     async def peek(self, guild_id: int) -> Optional[Track]:
-        async with self._get_lock(guild_id):
-            queue = self._queues.get(guild_id, [])
-            return queue[0] if queue else None
+        queue = self._queues.get(guild_id)
+        return queue[0] if queue else None
 
     async def clear(self, guild_id: int):
+        # Swapping in a fresh deque is O(1); the old one is simply dropped.
         async with self._get_lock(guild_id):
-            self._queues[guild_id] = []
+            self._queues[guild_id] = deque()
+
+    def forget(self, guild_id: int):
+        # Called when the bot leaves a guild so per-guild state doesn't accumulate.
+        self._queues.pop(guild_id, None)
+        self._locks.pop(guild_id, None)
 
     async def list_queue(self, guild_id: int) -> List[Track]:
-        async with self._get_lock(guild_id):
-            return list(self._queues.get(guild_id, []))
+        return list(self._queues.get(guild_id, ()))
 
     async def size(self, guild_id: int) -> int:
-        async with self._get_lock(guild_id):
-            return len(self._queues.get(guild_id, []))
+        return len(self._queues.get(guild_id, ()))
 
     async def is_empty(self, guild_id: int) -> bool:
-        return await self.size(guild_id) == 0
+        return not self._queues.get(guild_id)
@@ -0,0 +1,35 @@
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, penalty_window: float = 30.0):
+        self.rate = rate
+        self.burst = burst
+        self.penalty_window = penalty_window
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._penalty_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> float:
+        # After a server-side rate limit, run at half speed until the penalty window passes.
+        rate = self.rate / 2 if now < self._penalty_until else self.rate
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * rate)
+        self._updated = now
+        return rate
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                rate = self._refill(time.monotonic())
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                delay = (1.0 - self._tokens) / rate
+            time.sleep(delay)
+
+    def penalize(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._penalty_until = time.monotonic() + self.penalty_window